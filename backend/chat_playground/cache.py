@@ -0,0 +1,15 @@
+import config
+from response_cache import ResponseCache
+
+_cache = ResponseCache(config.CHAT_CACHE_MAX_SIZE, config.CHAT_CACHE_TTL_SECONDS)
+
+get = _cache.get
+put = _cache.put
+
+
+def make_key(model_id, system_prompt, prompt):
+    return ResponseCache.make_key(model_id, system_prompt, prompt)
+
+
+def is_cacheable(temperature):
+    return temperature == 0 or config.CHAT_CACHE_ALL_TEMPERATURES
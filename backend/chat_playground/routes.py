@@ -1,41 +1,80 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Path
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from botocore.exceptions import ClientError
 from . import models
 from . import services
+import config
 import logging
-import traceback
+import streaming
+import time
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
-@router.post("/foundation-models/model/chat/{model_id}/invoke")
-def invoke(body: models.ChatRequest, model_id: str):
+@router.post("/foundation-models/model/chat/{model_id}/invoke", response_model=models.ChatResponse)
+async def invoke(body: models.ChatRequest, model_id: str = Path(pattern=config.MODEL_ID_PATTERN), x_no_cache: bool = Header(False)):
     try:
-        logger.info(f"Chat invoke called with model_id: {model_id}")
-        logger.debug(f"Chat invoke request - model_id: {model_id}, prompt: {body.prompt[:100]}...")
+        start = time.perf_counter()
+        logger.debug("Chat invoke request - model_id: %s, prompt: %.100s...", model_id, body.prompt)
         
-        completion = services.invoke(body.prompt, model_id)
+        completion = await services.invoke(body.prompt, model_id, refresh=x_no_cache)
         
-        logger.info(f"Chat invoke completed successfully for model_id: {model_id}")
-        return models.ChatResponse(
-            completion=completion
+        logger.info(
+            "Chat invoke completed model_id=%s duration_ms=%.1f",
+            model_id, (time.perf_counter() - start) * 1000
         )
+        return ORJSONResponse({
+            "completion": completion
+        })
     except ClientError as e:
         error_code = e.response["Error"]["Code"]
         error_message = e.response["Error"].get("Message", "Unknown error")
+        logger.exception(
+            "ClientError in chat invoke: code=%s message=%s model_id=%s prompt=%.200s",
+            error_code, error_message, model_id, body.prompt,
+            extra={"model_id": model_id, "code": error_code}
+        )
+        
+        if error_code == "AccessDeniedException":
+            raise HTTPException(status_code=403, detail=error_message)
+        else:
+            raise HTTPException(status_code=500, detail=f"{error_code}: {error_message}")
+    except Exception as e:
         error_type = type(e).__name__
-        stack_trace = traceback.format_exc()
-        
-        logger.error(
-            f"ClientError in chat invoke:\n"
-            f"  Error Type: {error_type}\n"
-            f"  Error Code: {error_code}\n"
-            f"  Error Message: {error_message}\n"
-            f"  Model ID: {model_id}\n"
-            f"  Prompt: {body.prompt[:200]}...\n"
-            f"  Full Response: {e.response}\n"
-            f"  Stack Trace:\n{stack_trace}"
+        error_message = str(e)
+        logger.exception(
+            "Unexpected exception in chat invoke: model_id=%s prompt=%.200s",
+            model_id, body.prompt,
+            extra={"model_id": model_id}
+        )
+        
+        raise HTTPException(status_code=500, detail=f"{error_type}: {error_message}")
+
+
+@router.post("/foundation-models/model/chat/{model_id}/invoke/stream")
+async def invoke_stream(body: models.ChatRequest, model_id: str = Path(pattern=config.MODEL_ID_PATTERN)):
+    """
+    Stream the completion as Server-Sent Events, one `data: {"text": ...}` event per token delta.
+    An error after the stream has started is sent as a final `event: error` event.
+    """
+    try:
+        start = time.perf_counter()
+        logger.debug("Chat invoke_stream request - model_id: %s, prompt: %.100s...", model_id, body.prompt)
+        
+        deltas = await services.invoke_stream(body.prompt, model_id)
+        
+        logger.info(
+            "Chat invoke_stream opened model_id=%s duration_ms=%.1f",
+            model_id, (time.perf_counter() - start) * 1000
+        )
+    except ClientError as e:
+        error_code = e.response["Error"]["Code"]
+        error_message = e.response["Error"].get("Message", "Unknown error")
+        logger.exception(
+            "ClientError in chat invoke_stream: code=%s message=%s model_id=%s prompt=%.200s",
+            error_code, error_message, model_id, body.prompt,
+            extra={"model_id": model_id, "code": error_code}
         )
         
         if error_code == "AccessDeniedException":
@@ -45,15 +84,12 @@ def invoke(body: models.ChatRequest, model_id: str):
     except Exception as e:
         error_type = type(e).__name__
         error_message = str(e)
-        stack_trace = traceback.format_exc()
-        
-        logger.error(
-            f"Unexpected exception in chat invoke:\n"
-            f"  Error Type: {error_type}\n"
-            f"  Error Message: {error_message}\n"
-            f"  Model ID: {model_id}\n"
-            f"  Prompt: {body.prompt[:200]}...\n"
-            f"  Stack Trace:\n{stack_trace}"
+        logger.exception(
+            "Unexpected exception in chat invoke_stream: model_id=%s prompt=%.200s",
+            model_id, body.prompt,
+            extra={"model_id": model_id}
         )
         
         raise HTTPException(status_code=500, detail=f"{error_type}: {error_message}")
+
+    return StreamingResponse(streaming.sse_events(deltas, model_id), media_type="text/event-stream")
@@ -0,0 +1,78 @@
+import asyncio
+import clients
+import config
+import logging
+import numpy as np
+import orjson
+
+logger = logging.getLogger(__name__)
+
+EMBEDDING_DIMENSIONS = 512
+
+
+class _Index:
+    """
+    L2-normalized prompt embeddings with the completions they produced.
+
+    Stored in a preallocated ring buffer: once full, each new entry overwrites
+    the oldest one in place instead of reallocating the matrix.
+    """
+
+    def __init__(self):
+        max_size = config.CHAT_SEMANTIC_CACHE_MAX_SIZE
+        self.embeddings = np.empty((max_size, EMBEDDING_DIMENSIONS), dtype=np.float32)
+        self.completions = [None] * max_size
+        self.size = 0
+        self.next = 0
+
+    def search(self, embedding):
+        if not self.size:
+            return None, 0.0
+        similarities = self.embeddings[:self.size] @ embedding
+        best = int(np.argmax(similarities))
+        return self.completions[best], float(similarities[best])
+
+    def add(self, embedding, completion):
+        self.embeddings[self.next] = embedding
+        self.completions[self.next] = completion
+        self.next = (self.next + 1) % len(self.completions)
+        self.size = min(self.size + 1, len(self.completions))
+
+
+# One index per (model_id, system prompt), so a hit never crosses models
+_indexes = {}
+_lock = asyncio.Lock()
+
+
+async def embed(text):
+    bedrock_runtime = clients.get("bedrock-runtime")
+    response = await bedrock_runtime.invoke_model(
+        body=orjson.dumps({
+            "inputText": text,
+            "dimensions": EMBEDDING_DIMENSIONS,
+            "normalize": True
+        }),
+        modelId=config.CHAT_SEMANTIC_CACHE_EMBEDDING_MODEL_ID
+    )
+    response_body = orjson.loads(await response["body"].read())
+    embedding = np.asarray(response_body["embedding"], dtype=np.float32)
+    return embedding / np.linalg.norm(embedding)
+
+
+async def get(model_id, system_prompt, embedding):
+    async with _lock:
+        index = _indexes.get((model_id, system_prompt))
+        if index is None:
+            return None
+        completion, similarity = index.search(embedding)
+
+    logger.debug("Semantic cache best similarity for model_id %s: %.3f", model_id, similarity)
+    if similarity >= config.CHAT_SEMANTIC_CACHE_THRESHOLD:
+        return completion
+    return None
+
+
+async def put(model_id, system_prompt, embedding, completion):
+    async with _lock:
+        index = _indexes.setdefault((model_id, system_prompt), _Index())
+        index.add(embedding, completion)
@@ -1,66 +1,165 @@
-import boto3
-import json
+import asyncio
+import clients
+import config
 import logging
-import traceback
+import orjson
+import streaming
+from . import cache
+from . import semantic_cache
 
 logger = logging.getLogger(__name__)
 
-bedrock_runtime = boto3.client(
-    service_name="bedrock-runtime",
-    region_name="us-east-1",
-)
+# Cache key -> task of the Bedrock call currently running for that prompt
+_inflight = {}
 
-def invoke(prompt, model_id):
+# Models that support Bedrock latency-optimized inference. Requests for these
+# opt in via performanceConfigLatency; Bedrock falls back to standard latency
+# on its own once the optimized quota is exhausted.
+LATENCY_OPTIMIZED_MODELS = {
+    "anthropic.claude-3-5-haiku-20241022-v1:0",
+    "us.anthropic.claude-3-5-haiku-20241022-v1:0",
+}
+
+
+SYSTEM_PROMPT = """
+                Take the role of a friendly chat bot. Your responses are brief.
+                You sometimes use emojis where appropriate, but you don't overdo it.
+                You engage human in a dialog by regularly asking questions,
+                except when Human indicates that the conversation is over.
+               """
+
+TEMPERATURE = 0.8
+
+# Everything except the user prompt is constant, so it is serialized once at
+# import and each request only has to encode the prompt itself.
+_BODY_PREFIX = orjson.dumps({
+    "anthropic_version": "bedrock-2023-05-31",
+    "max_tokens": 1024,
+    "temperature": TEMPERATURE,
+    "system": SYSTEM_PROMPT,
+})[:-1] + b',"messages":[{"role":"user","content":'
+_BODY_SUFFIX = b"}]}"
+
+
+def build_request_body(prompt):
+    return _BODY_PREFIX + orjson.dumps(prompt) + _BODY_SUFFIX
+
+
+def performance_config(model_id):
+    if model_id in LATENCY_OPTIMIZED_MODELS:
+        return {"performanceConfigLatency": "optimized"}
+    return {}
+
+
+async def invoke(prompt, model_id, refresh=False):
     try:
-        logger.info(f"Invoking Bedrock with model_id: {model_id}")
-
-        systemPrompt = """
-                        Take the role of a friendly chat bot. Your responses are brief.
-                        You sometimes use emojis where appropriate, but you don't overdo it.
-                        You engage human in a dialog by regularly asking questions,
-                        except when Human indicates that the conversation is over.
-                       """;
-
-        prompt_config = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": 1024,
-            "temperature": 0.8,
-            "system": systemPrompt,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
-        }
-
-        logger.debug(f"Bedrock invoke_model request payload - model_id: {model_id}, config: {json.dumps(prompt_config, indent=2)}")
-
-        response = bedrock_runtime.invoke_model(
-            body=json.dumps(prompt_config),
-            modelId=model_id
+        if not cache.is_cacheable(TEMPERATURE):
+            return await _invoke_bedrock(prompt, model_id)
+
+        cache_key = cache.make_key(model_id, SYSTEM_PROMPT, prompt)
+
+        # A refresh skips the lookups but still stores the fresh completion
+        if refresh:
+            completion = await _invoke_bedrock(prompt, model_id)
+            await cache.put(cache_key, completion)
+            return completion
+
+        completion = await cache.get(cache_key)
+        if completion is not None:
+            logger.info("Chat cache hit model_id=%s", model_id)
+            return completion
+
+        # Identical prompts that arrive while a call for them is in flight
+        # await that call instead of starting another one. The task is shielded
+        # so a disconnecting client does not cancel it for the others.
+        task = _inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(_invoke_and_cache(prompt, model_id, cache_key))
+            _inflight[cache_key] = task
+        else:
+            logger.info("Joining in-flight Bedrock invocation model_id=%s", model_id)
+
+        return await asyncio.shield(task)
+    except Exception:
+        logger.exception(
+            "Error in chat service invoke: model_id=%s prompt=%.200s",
+            model_id, prompt,
+            extra={"model_id": model_id}
         )
+        raise
 
-        logger.debug(f"Bedrock invoke_model raw response metadata: {response.get('ResponseMetadata')}")
-        
-        response_body = json.loads(response.get("body").read())
-        logger.debug(f"Bedrock invoke_model response body: {json.dumps(response_body, indent=2)}")
 
-        completion = response_body['content'][0]['text']
-        logger.info(f"Successfully completed Bedrock invocation for model_id: {model_id}")
-        
+async def _invoke_and_cache(prompt, model_id, cache_key):
+    try:
+        embedding = None
+        if config.CHAT_SEMANTIC_CACHE_ENABLED:
+            # The semantic cache is best effort; if the embedding call fails
+            # the prompt goes to the chat model as if the cache were disabled
+            try:
+                embedding = await semantic_cache.embed(prompt)
+                completion = await semantic_cache.get(model_id, SYSTEM_PROMPT, embedding)
+            except Exception:
+                logger.exception("Chat semantic cache lookup failed, invoking model_id=%s", model_id)
+                embedding = completion = None
+            if completion is not None:
+                logger.info("Chat semantic cache hit model_id=%s", model_id)
+                await cache.put(cache_key, completion)
+                return completion
+
+        completion = await _invoke_bedrock(prompt, model_id)
+
+        await cache.put(cache_key, completion)
+        if embedding is not None:
+            await semantic_cache.put(model_id, SYSTEM_PROMPT, embedding, completion)
+
         return completion
-    except Exception as e:
-        error_type = type(e).__name__
-        error_message = str(e)
-        stack_trace = traceback.format_exc()
-        
-        logger.error(
-            f"Error in chat service invoke:\n"
-            f"  Error Type: {error_type}\n"
-            f"  Error Message: {error_message}\n"
-            f"  Model ID: {model_id}\n"
-            f"  Prompt: {prompt[:200]}...\n"
-            f"  Stack Trace:\n{stack_trace}"
+    finally:
+        del _inflight[cache_key]
+
+
+async def _invoke_bedrock(prompt, model_id):
+    body = build_request_body(prompt)
+    logger.debug("Bedrock invoke_model_with_response_stream request payload - model_id: %s, body: %s", model_id, body)
+
+    # The response is consumed as an event stream and only the text deltas
+    # are kept, rather than buffering and parsing the whole JSON envelope.
+    bedrock_runtime = clients.get("bedrock-runtime")
+    response = await bedrock_runtime.invoke_model_with_response_stream(
+        body=body,
+        modelId=model_id,
+        **performance_config(model_id)
+    )
+
+    logger.debug("Bedrock invoke_model_with_response_stream raw response metadata: %s", response.get("ResponseMetadata"))
+
+    return "".join([text async for text in streaming.claude_text_deltas(response["body"], model_id)])
+
+
+async def invoke_stream(prompt, model_id):
+    """
+    Start a streaming invocation and return an async generator of text deltas.
+
+    The Bedrock call is made before returning, so errors such as
+    AccessDeniedException are raised here rather than mid-stream.
+    """
+    try:
+        body = build_request_body(prompt)
+        logger.debug("Bedrock invoke_model_with_response_stream request payload - model_id: %s, body: %s", model_id, body)
+
+        bedrock_runtime = clients.get("bedrock-runtime")
+        response = await bedrock_runtime.invoke_model_with_response_stream(
+            body=body,
+            modelId=model_id,
+            **performance_config(model_id)
+        )
+
+        logger.debug("Bedrock invoke_model_with_response_stream raw response metadata: %s", response.get("ResponseMetadata"))
+    except Exception:
+        logger.exception(
+            "Error in chat service invoke_stream: model_id=%s prompt=%.200s",
+            model_id, prompt,
+            extra={"model_id": model_id}
         )
         raise
+
+    return streaming.claude_text_deltas(response["body"], model_id)
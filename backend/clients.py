@@ -0,0 +1,106 @@
+import aioboto3
+import asyncio
+import config
+import logging
+from aiobotocore.config import AioConfig
+from contextlib import AsyncExitStack, asynccontextmanager
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REGION = "us-east-1"
+
+# Upper bound on cached clients, since the region comes from a query parameter
+MAX_CACHED_CLIENTS = 8
+
+# Pool sized for event-loop concurrency; idle connections are kept alive so
+# consecutive requests skip the TCP and TLS handshake
+CLIENT_CONFIG = AioConfig(
+    max_pool_connections=100,
+    retries={"mode": "adaptive", "max_attempts": 5},
+    connect_timeout=3,
+    read_timeout=120,
+    connector_args={"keepalive_timeout": 75},
+)
+
+# Same settings without in-region retries, for clients whose callers fail over
+# to another region when throttled instead of backing off in the same one
+FAILOVER_CLIENT_CONFIG = CLIENT_CONFIG.merge(AioConfig(retries={"mode": "standard", "total_max_attempts": 1}))
+
+session = aioboto3.Session()
+
+_exit_stack = AsyncExitStack()
+_clients = {}
+_failover_clients = {}
+_lock = asyncio.Lock()
+
+
+async def _open(service_name, region_name):
+    logger.info("Opening %s client in region: %s", service_name, region_name)
+    client = await _exit_stack.enter_async_context(
+        session.client(service_name=service_name, region_name=region_name, config=CLIENT_CONFIG)
+    )
+    _clients[(service_name, region_name)] = client
+    return client
+
+
+async def start():
+    """
+    Open the shared Bedrock clients for the default region, plus the failover
+    runtime clients for every region in config.CLAUDE_REGIONS and, when batch
+    inference is configured, the S3 client.
+
+    Called once from the application lifespan so that every request reuses the
+    same clients (and their connection pools) instead of creating new ones.
+    """
+    for service_name in ("bedrock", "bedrock-runtime"):
+        await _open(service_name, DEFAULT_REGION)
+
+    # S3 holds the text playground's batch inference input and output
+    if config.BATCH_INFERENCE_S3_BUCKET:
+        await _open("s3", DEFAULT_REGION)
+
+    for region_name in config.CLAUDE_REGIONS:
+        logger.info("Opening bedrock-runtime failover client in region: %s", region_name)
+        _failover_clients[region_name] = await _exit_stack.enter_async_context(
+            session.client(service_name="bedrock-runtime", region_name=region_name, config=FAILOVER_CLIENT_CONFIG)
+        )
+
+
+async def stop():
+    """Close all shared clients on application shutdown."""
+    logger.info("Closing Bedrock clients")
+    await _exit_stack.aclose()
+    _clients.clear()
+    _failover_clients.clear()
+
+
+def get(service_name):
+    """Return the shared client for the given service in the default region."""
+    return _clients[(service_name, DEFAULT_REGION)]
+
+
+def get_failover(region_name):
+    """Return the bedrock-runtime client without in-region retries for the region."""
+    return _failover_clients[region_name]
+
+
+@asynccontextmanager
+async def for_region(service_name, region_name):
+    """
+    Yield the shared client for the given service and region.
+
+    Clients for other regions are opened on first use and kept for the lifetime
+    of the app. Once MAX_CACHED_CLIENTS is reached, a temporary client is used.
+    """
+    client = _clients.get((service_name, region_name))
+    if client is None:
+        async with _lock:
+            client = _clients.get((service_name, region_name))
+            if client is None and len(_clients) < MAX_CACHED_CLIENTS:
+                client = await _open(service_name, region_name)
+
+    if client is not None:
+        yield client
+    else:
+        async with session.client(service_name=service_name, region_name=region_name, config=CLIENT_CONFIG) as client:
+            yield client
@@ -1,7 +1,58 @@
+import os
+
 HOST = "0.0.0.0"
 PORT = 55500
 
 # Enable CORS for all domains, remember to change this for production purposes
 ALLOWED_CORS_ORIGINS = [ "*" ]
 ALLOWED_CORS_HEADERS = [ "*" ]
-ALLOWED_CORS_METHODS = [ "GET", "POST" ]
\ No newline at end of file
+ALLOWED_CORS_METHODS = [ "GET", "POST" ]
+
+# Chat response cache. Completions are only cached for temperature 0 unless
+# CHAT_CACHE_ALL_TEMPERATURES is enabled (the chat playground runs at 0.8)
+CHAT_CACHE_MAX_SIZE = 10_000
+CHAT_CACHE_TTL_SECONDS = 3600
+CHAT_CACHE_ALL_TEMPERATURES = False
+
+# Semantic chat cache: reuse a cached completion when a new prompt's embedding
+# is close enough to a previous one. Subject to the same temperature rule
+CHAT_SEMANTIC_CACHE_ENABLED = False
+CHAT_SEMANTIC_CACHE_MAX_SIZE = 1000
+CHAT_SEMANTIC_CACHE_THRESHOLD = 0.92
+CHAT_SEMANTIC_CACHE_EMBEDDING_MODEL_ID = "amazon.titan-embed-text-v2:0"
+
+# Text response cache. Only near-deterministic calls (temperature at or below
+# TEXT_CACHE_MAX_TEMPERATURE) are cached
+TEXT_CACHE_MAX_SIZE = 10_000
+TEXT_CACHE_TTL_SECONDS = 24 * 3600
+TEXT_CACHE_MAX_TEMPERATURE = 0.01
+
+# Model IDs accepted in request paths. Malformed IDs are rejected with a 422
+# before any call to Bedrock is made
+MODEL_ID_PATTERN = r"^[a-zA-Z0-9.:\-_/]{1,200}$"
+
+# Source regions the Claude cross-region inference profile is called from.
+# Calls rotate through them and fail over to the next one when throttled
+CLAUDE_REGIONS = ["us-east-1", "us-west-2", "us-east-2"]
+
+# Maximum number of images generated concurrently by one batch request
+IMAGE_BATCH_MAX_SIZE = 10
+
+# Text playground invocations allowed in flight per model; further requests
+# wait for a free slot instead of being throttled by Bedrock
+TEXT_MAX_CONCURRENT_INVOCATIONS = 32
+
+# Bedrock batch inference for the text playground. The batch endpoints are
+# enabled once both are set: the S3 bucket that holds job input and output,
+# and the IAM service role Bedrock assumes to read and write it
+BATCH_INFERENCE_S3_BUCKET = os.getenv("BATCH_INFERENCE_S3_BUCKET")
+BATCH_INFERENCE_ROLE_ARN = os.getenv("BATCH_INFERENCE_ROLE_ARN")
+BATCH_INFERENCE_S3_PREFIX = "fm-playground/batch"
+
+# Record limits Bedrock enforces per batch job (default quotas). Jobs outside
+# them are rejected with a 422 before anything is uploaded
+BATCH_INFERENCE_MIN_RECORDS = 100
+BATCH_INFERENCE_MAX_RECORDS = 50_000
+
+# Bedrock accepts 11-character alphanumeric record IDs
+BATCH_RECORD_ID_PATTERN = r"^[a-zA-Z0-9]{11}$"
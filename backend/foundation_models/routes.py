@@ -1,33 +1,25 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Path
 from botocore.exceptions import ClientError
 from . import service
+import config
 import logging
-import traceback
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 @router.get("/foundation-models")
-def list_foundation_models():
+async def list_foundation_models():
     try:
-        logger.info("Listing foundation models")
-        result = service.list_foundation_models()
-        logger.info(f"Successfully retrieved {len(result)} foundation models")
-        logger.debug(f"Foundation models list: {result}")
+        result = await service.list_foundation_models()
+        logger.debug("Foundation models list: %s", result)
         return result
     except ClientError as e:
         error_code = e.response["Error"]["Code"]
         error_message = e.response["Error"].get("Message", "Unknown error")
-        error_type = type(e).__name__
-        stack_trace = traceback.format_exc()
-        
-        logger.error(
-            f"ClientError in list_foundation_models:\n"
-            f"  Error Type: {error_type}\n"
-            f"  Error Code: {error_code}\n"
-            f"  Error Message: {error_message}\n"
-            f"  Full Response: {e.response}\n"
-            f"  Stack Trace:\n{stack_trace}"
+        logger.exception(
+            "ClientError in list_foundation_models: code=%s message=%s",
+            error_code, error_message,
+            extra={"code": error_code}
         )
         
         if error_code == "AccessDeniedException":
@@ -37,39 +29,29 @@ def list_foundation_models():
     except Exception as e:
         error_type = type(e).__name__
         error_message = str(e)
-        stack_trace = traceback.format_exc()
-        
-        logger.error(
-            f"Unexpected exception in list_foundation_models:\n"
-            f"  Error Type: {error_type}\n"
-            f"  Error Message: {error_message}\n"
-            f"  Stack Trace:\n{stack_trace}"
-        )
+        logger.exception("Unexpected exception in list_foundation_models")
         
         raise HTTPException(status_code=500, detail=f"{error_type}: {error_message}")
 
+@router.post("/foundation-models/refresh")
+async def refresh_foundation_models():
+    """Drop the cached model listings so the next request fetches them from Bedrock."""
+    service.clear_cache()
+    return {"status": "ok"}
+
 @router.get("/foundation-models/model/{model_id}")
-def get_foundation_model_details(model_id: str):
+async def get_foundation_model_details(model_id: str = Path(pattern=config.MODEL_ID_PATTERN)):
     try:
-        logger.info(f"Getting foundation model details for model_id: {model_id}")
-        result = service.get_foundation_model(model_id)
-        logger.info(f"Successfully retrieved details for model_id: {model_id}")
-        logger.debug(f"Model details: {result}")
+        result = await service.get_foundation_model(model_id)
+        logger.debug("Model details: %s", result)
         return result
     except ClientError as e:
         error_code = e.response["Error"]["Code"]
         error_message = e.response["Error"].get("Message", "Unknown error")
-        error_type = type(e).__name__
-        stack_trace = traceback.format_exc()
-        
-        logger.error(
-            f"ClientError in get_foundation_model_details:\n"
-            f"  Error Type: {error_type}\n"
-            f"  Error Code: {error_code}\n"
-            f"  Error Message: {error_message}\n"
-            f"  Model ID: {model_id}\n"
-            f"  Full Response: {e.response}\n"
-            f"  Stack Trace:\n{stack_trace}"
+        logger.exception(
+            "ClientError in get_foundation_model_details: code=%s message=%s model_id=%s",
+            error_code, error_message, model_id,
+            extra={"model_id": model_id, "code": error_code}
         )
         
         if error_code == "AccessDeniedException":
@@ -79,14 +61,10 @@ def get_foundation_model_details(model_id: str):
     except Exception as e:
         error_type = type(e).__name__
         error_message = str(e)
-        stack_trace = traceback.format_exc()
-        
-        logger.error(
-            f"Unexpected exception in get_foundation_model_details:\n"
-            f"  Error Type: {error_type}\n"
-            f"  Error Message: {error_message}\n"
-            f"  Model ID: {model_id}\n"
-            f"  Stack Trace:\n{stack_trace}"
+        logger.exception(
+            "Unexpected exception in get_foundation_model_details: model_id=%s",
+            model_id,
+            extra={"model_id": model_id}
         )
         
         raise HTTPException(status_code=500, detail=f"{error_type}: {error_message}")
@@ -1,69 +1,89 @@
-import boto3
+import clients
 import logging
-import traceback
+import time
+from cachetools import TTLCache
 
 logger = logging.getLogger(__name__)
 
-bedrock_client = boto3.client(
-    service_name="bedrock",
-    region_name="us-east-1"
-)
+# The model catalog changes rarely, so listings are cached per region for a few
+# minutes, together with an index of the summaries by model ID
+_model_summaries_cache = TTLCache(maxsize=4, ttl=300)
 
 
-def list_foundation_models():
+async def list_foundation_models(region_name=clients.DEFAULT_REGION):
+    cached = _model_summaries_cache.get(region_name)
+    if cached is not None:
+        logger.debug("Returning cached foundation models for region: %s", region_name)
+        return cached[0]
+
     try:
-        logger.info("Calling bedrock.list_foundation_models()")
-        logger.debug("Bedrock list_foundation_models request - no parameters")
-        
-        response = bedrock_client.list_foundation_models()
+        start = time.perf_counter()
+        async with clients.for_region("bedrock", region_name) as bedrock_client:
+            response = await bedrock_client.list_foundation_models()
         
-        logger.debug(f"Bedrock list_foundation_models response metadata: {response.get('ResponseMetadata')}")
-        logger.debug(f"Bedrock list_foundation_models - model count: {len(response.get('modelSummaries', []))}")
+        logger.debug("Bedrock list_foundation_models response metadata: %s", response.get("ResponseMetadata"))
         
         model_summaries = response['modelSummaries']
-        logger.info(f"Successfully retrieved {len(model_summaries)} foundation models")
-        
-        return model_summaries
-    except Exception as e:
-        error_type = type(e).__name__
-        error_message = str(e)
-        stack_trace = traceback.format_exc()
+        logger.info(
+            "Bedrock list_foundation_models region=%s count=%d duration_ms=%.1f",
+            region_name, len(model_summaries), (time.perf_counter() - start) * 1000
+        )
         
-        logger.error(
-            f"Error in list_foundation_models:\n"
-            f"  Error Type: {error_type}\n"
-            f"  Error Message: {error_message}\n"
-            f"  Stack Trace:\n{stack_trace}"
+        _model_summaries_cache[region_name] = (
+            model_summaries,
+            {model["modelId"]: model for model in model_summaries}
         )
+        return model_summaries
+    except Exception:
+        logger.exception("Error in list_foundation_models")
         raise
 
 
-def get_foundation_model(model_id):
+def find_cached_model(model_id, region_name=clients.DEFAULT_REGION):
+    """
+    Return the model's summary from the cached listing for the region.
+
+    Summaries carry the same fields as get_foundation_model's modelDetails.
+    Returns None if the listing is not cached or does not contain the model.
+    """
+    cached = _model_summaries_cache.get(region_name)
+    if cached is None:
+        return None
+    return cached[1].get(model_id)
+
+
+def clear_cache():
+    logger.info("Clearing cached foundation model listings")
+    _model_summaries_cache.clear()
+
+
+async def get_foundation_model(model_id):
+    model_details = find_cached_model(model_id)
+    if model_details is not None:
+        logger.debug("Returning cached details for model_id: %s", model_id)
+        return model_details
+
     try:
-        logger.info(f"Calling bedrock.get_foundation_model() with model_id: {model_id}")
-        logger.debug(f"Bedrock get_foundation_model request - modelIdentifier: {model_id}")
-        
-        response = bedrock_client.get_foundation_model(
+        start = time.perf_counter()
+        bedrock_client = clients.get("bedrock")
+        response = await bedrock_client.get_foundation_model(
             modelIdentifier=model_id
         )
         
-        logger.debug(f"Bedrock get_foundation_model response metadata: {response.get('ResponseMetadata')}")
-        logger.debug(f"Bedrock get_foundation_model response - modelDetails: {response.get('modelDetails')}")
+        logger.debug("Bedrock get_foundation_model response metadata: %s", response.get("ResponseMetadata"))
+        logger.debug("Bedrock get_foundation_model response - modelDetails: %s", response.get("modelDetails"))
         
         model_details = response['modelDetails']
-        logger.info(f"Successfully retrieved foundation model details for model_id: {model_id}")
+        logger.info(
+            "Bedrock get_foundation_model model_id=%s duration_ms=%.1f",
+            model_id, (time.perf_counter() - start) * 1000
+        )
         
         return model_details
-    except Exception as e:
-        error_type = type(e).__name__
-        error_message = str(e)
-        stack_trace = traceback.format_exc()
-        
-        logger.error(
-            f"Error in get_foundation_model:\n"
-            f"  Error Type: {error_type}\n"
-            f"  Error Message: {error_message}\n"
-            f"  Model ID: {model_id}\n"
-            f"  Stack Trace:\n{stack_trace}"
+    except Exception:
+        logger.exception(
+            "Error in get_foundation_model: model_id=%s",
+            model_id,
+            extra={"model_id": model_id}
         )
         raise
\ No newline at end of file
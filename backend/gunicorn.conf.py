@@ -0,0 +1,17 @@
+import multiprocessing
+import os
+
+import config as app_config
+
+# Multi-process deployment: gunicorn -c gunicorn.conf.py main:app
+# Each worker runs its own event loop and Bedrock clients, so request handling
+# (JSON parsing, SigV4 signing, TLS) is spread across all CPU cores.
+bind = f"{app_config.HOST}:{app_config.PORT}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+keepalive = 75
+
+# Restart a worker whose event loop has not heartbeated for this long, e.g.
+# because it is blocked. Requests waiting on Bedrock do not count, the loop
+# keeps heartbeating while they are awaited
+timeout = 30
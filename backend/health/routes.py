@@ -1,14 +1,16 @@
-from fastapi import APIRouter, HTTPException, Query
+from fastapi import APIRouter, HTTPException, Path, Query
 from . import service
+import config
 import logging
 import os
+import time
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
 @router.get("/api/health")
-def health_check(region: str = Query(None, description="AWS region to check (defaults to us-east-1)")):
+async def health_check(region: str = Query(None, description="AWS region to check (defaults to us-east-1)")):
     """
     Health check endpoint to verify backend API status and AWS Bedrock connectivity.
     
@@ -23,29 +25,36 @@ def health_check(region: str = Query(None, description="AWS region to check (def
     - bedrock_client_initialized: whether boto3 client was successfully created
     - available_models: list of accessible foundation models
     - model_count: number of available models
+    - worker_pid: process ID of the worker that served the request
     - errors: any connectivity or configuration issues
     """
     # Use provided region or default to us-east-1
     target_region = region if region else "us-east-1"
     
-    logger.info(f"Health check requested for region: {target_region}")
+    start = time.perf_counter()
     
     try:
-        result = service.check_bedrock_health(region_name=target_region)
+        result = await service.check_bedrock_health(region_name=target_region)
         
         # Return appropriate HTTP status code based on health status
         if result["status"] == "unhealthy":
-            logger.warning(f"Health check failed: {result.get('errors', [])}")
+            logger.warning(
+                "Health check unhealthy region=%s duration_ms=%.1f errors=%s",
+                target_region, (time.perf_counter() - start) * 1000, result["errors"]
+            )
             # Still return 200 but with unhealthy status in response body
             # This is common practice for health checks to distinguish from endpoint errors
             return result
         
-        logger.info(f"Health check passed: {result['model_count']} models available")
+        logger.info(
+            "Health check healthy region=%s model_count=%d duration_ms=%.1f",
+            target_region, result["model_count"], (time.perf_counter() - start) * 1000
+        )
         return result
         
     except Exception as e:
         error_message = str(e)
-        logger.error(f"Unexpected error in health_check endpoint: {error_message}")
+        logger.exception("Unexpected error in health_check endpoint")
         # For unexpected errors, return 500
         raise HTTPException(
             status_code=500,
@@ -53,8 +62,26 @@ def health_check(region: str = Query(None, description="AWS region to check (def
         )
 
 
+@router.get("/api/ready")
+async def readiness_check():
+    """
+    Readiness endpoint for load balancers and orchestrators.
+    
+    Returns 200 once the startup warmup has listed the foundation models, and
+    503 while it is still running or if it failed. Use /api/health for a
+    liveness check that reports Bedrock connectivity details.
+    """
+    result = service.readiness()
+    
+    if not result["ready"]:
+        logger.warning("Readiness check failed: %s", result)
+        raise HTTPException(status_code=503, detail=result)
+    
+    return result
+
+
 @router.get("/api/health/model/{model_id}")
-def validate_model(model_id: str, region: str = Query(None, description="AWS region to check (defaults to us-east-1)")):
+async def validate_model(model_id: str = Path(pattern=config.MODEL_ID_PATTERN), region: str = Query(None, description="AWS region to check (defaults to us-east-1)")):
     """
     Model validation endpoint that accepts a model ID and verifies if it's accessible.
     
@@ -77,13 +104,16 @@ def validate_model(model_id: str, region: str = Query(None, description="AWS reg
     # Use provided region or default to us-east-1
     target_region = region if region else "us-east-1"
     
-    logger.info(f"Model validation requested for model_id: {model_id} in region: {target_region}")
+    start = time.perf_counter()
     
     try:
-        result = service.validate_model(model_id=model_id, region_name=target_region)
+        result = await service.validate_model(model_id=model_id, region_name=target_region)
         
         if not result["accessible"]:
-            logger.warning(f"Model validation failed for {model_id}: {result.get('errors', [])}")
+            logger.warning(
+                "Model validation failed model_id=%s region=%s duration_ms=%.1f errors=%s",
+                model_id, target_region, (time.perf_counter() - start) * 1000, result["errors"]
+            )
             # Return 404 if model is not found/accessible
             if any(error.get("code") == "ResourceNotFoundException" for error in result.get("errors", [])):
                 raise HTTPException(
@@ -99,7 +129,10 @@ def validate_model(model_id: str, region: str = Query(None, description="AWS reg
             # For other errors, return the result with error details
             return result
         
-        logger.info(f"Model validation passed for {model_id}")
+        logger.info(
+            "Model validation passed model_id=%s region=%s duration_ms=%.1f",
+            model_id, target_region, (time.perf_counter() - start) * 1000
+        )
         return result
         
     except HTTPException:
@@ -107,7 +140,11 @@ def validate_model(model_id: str, region: str = Query(None, description="AWS reg
         raise
     except Exception as e:
         error_message = str(e)
-        logger.error(f"Unexpected error in validate_model endpoint for {model_id}: {error_message}")
+        logger.exception(
+            "Unexpected error in validate_model endpoint: model_id=%s",
+            model_id,
+            extra={"model_id": model_id}
+        )
         raise HTTPException(
             status_code=500,
             detail=f"Model validation failed with unexpected error: {error_message}"
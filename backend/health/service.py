@@ -1,12 +1,102 @@
-import boto3
+import asyncio
+import clients
 import logging
-import traceback
+import os
+from foundation_models import service as foundation_models_service
 from botocore.exceptions import ClientError, NoCredentialsError, PartialCredentialsError
 
 logger = logging.getLogger(__name__)
 
+# Fields returned per model, with the value used when Bedrock omits one
+_HEALTH_MODEL_FIELDS = {
+    "modelId": None,
+    "modelName": None,
+    "providerName": None,
+    "inputModalities": (),
+    "outputModalities": ()
+}
 
-def check_bedrock_health(region_name="us-east-1"):
+_MODEL_DETAIL_FIELDS = {
+    "modelId": None,
+    "modelArn": None,
+    "modelName": None,
+    "providerName": None,
+    "inputModalities": (),
+    "outputModalities": (),
+    "responseStreamingSupported": None,
+    "customizationsSupported": (),
+    "inferenceTypesSupported": ()
+}
+
+# Trimmed model lists per region, rebuilt only when the cached listing changes
+_available_models = {}
+
+# Startup warmup state, reported by the readiness endpoint
+_warmup_done = False
+_warmup_error = None
+
+# Upper bound on the backoff between failed warmup attempts
+_WARMUP_MAX_RETRY_DELAY_SECONDS = 60
+
+
+def _select_fields(model, fields):
+    return {key: model.get(key, default) for key, default in fields.items()}
+
+
+def _available_models_for(region_name, model_summaries):
+    cached = _available_models.get(region_name)
+    if cached is not None and cached[0] is model_summaries:
+        return cached[1]
+
+    available_models = [_select_fields(model, _HEALTH_MODEL_FIELDS) for model in model_summaries]
+    _available_models[region_name] = (model_summaries, available_models)
+    return available_models
+
+
+async def warm_up(region_name=clients.DEFAULT_REGION):
+    """
+    Prime the Bedrock client and the cached model listing at startup.
+
+    The first call resolves credentials, the endpoint and the TLS session, so
+    doing it here keeps that cost off the first user request. A failure is
+    recorded rather than raised and the warmup is retried with exponential
+    backoff; the app keeps serving and reports not ready until one succeeds.
+    """
+    global _warmup_done, _warmup_error
+
+    delay = 1
+    while True:
+        try:
+            logger.info("Warming up Bedrock client in region: %s", region_name)
+            await foundation_models_service.list_foundation_models(region_name=region_name)
+            _warmup_done = True
+            _warmup_error = None
+            logger.info("Warmup completed")
+            return
+        except Exception as e:
+            _warmup_error = f"{type(e).__name__}: {str(e)}"
+            logger.warning("Warmup failed, retrying in %d s: %s", delay, _warmup_error)
+
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, _WARMUP_MAX_RETRY_DELAY_SECONDS)
+
+
+def readiness():
+    """
+    Report whether the startup warmup has completed successfully.
+
+    Returns:
+        dict: Readiness response with ready flag and the error of the last
+        failed warmup attempt, if any
+    """
+    return {
+        "ready": _warmup_done and _warmup_error is None,
+        "warmup_completed": _warmup_done,
+        "error": _warmup_error
+    }
+
+
+async def check_bedrock_health(region_name="us-east-1"):
     """
     Check AWS Bedrock connectivity and list available models.
     
@@ -19,41 +109,24 @@ def check_bedrock_health(region_name="us-east-1"):
         "bedrock_client_initialized": False,
         "available_models": [],
         "model_count": 0,
+        "worker_pid": os.getpid(),
         "errors": []
     }
     
     try:
         # Test boto3 client initialization
-        logger.info(f"Initializing bedrock client for health check in region: {region_name}")
-        bedrock_client = boto3.client(
-            service_name="bedrock",
-            region_name=region_name
-        )
         health_status["bedrock_client_initialized"] = True
-        logger.info("Bedrock client initialized successfully")
         
-        # Test listing foundation models
-        logger.info("Attempting to list foundation models")
-        response = bedrock_client.list_foundation_models()
-        
-        model_summaries = response.get('modelSummaries', [])
+        # Test listing foundation models (served from the shared TTL cache when fresh)
+        model_summaries = await foundation_models_service.list_foundation_models(region_name=region_name)
         health_status["model_count"] = len(model_summaries)
         
         # Extract basic model information
-        for model in model_summaries:
-            health_status["available_models"].append({
-                "modelId": model.get("modelId"),
-                "modelName": model.get("modelName"),
-                "providerName": model.get("providerName"),
-                "inputModalities": model.get("inputModalities", []),
-                "outputModalities": model.get("outputModalities", [])
-            })
+        health_status["available_models"] = _available_models_for(region_name, model_summaries)
         
-        logger.info(f"Successfully retrieved {len(model_summaries)} foundation models")
-        
-    except NoCredentialsError as e:
+    except NoCredentialsError:
         error_msg = "No AWS credentials found"
-        logger.error(f"NoCredentialsError in check_bedrock_health: {error_msg}")
+        logger.error("NoCredentialsError in check_bedrock_health: %s", error_msg)
         health_status["status"] = "unhealthy"
         health_status["errors"].append({
             "type": "NoCredentialsError",
@@ -63,7 +136,7 @@ def check_bedrock_health(region_name="us-east-1"):
         
     except PartialCredentialsError as e:
         error_msg = f"Incomplete AWS credentials: {str(e)}"
-        logger.error(f"PartialCredentialsError in check_bedrock_health: {error_msg}")
+        logger.error("PartialCredentialsError in check_bedrock_health: %s", error_msg)
         health_status["status"] = "unhealthy"
         health_status["errors"].append({
             "type": "PartialCredentialsError",
@@ -75,10 +148,9 @@ def check_bedrock_health(region_name="us-east-1"):
         error_code = e.response["Error"]["Code"]
         error_message = e.response["Error"].get("Message", "Unknown error")
         logger.error(
-            f"ClientError in check_bedrock_health:\n"
-            f"  Error Code: {error_code}\n"
-            f"  Error Message: {error_message}\n"
-            f"  Full Response: {e.response}"
+            "ClientError in check_bedrock_health: code=%s message=%s",
+            error_code, error_message,
+            extra={"code": error_code}
         )
         health_status["status"] = "unhealthy"
         health_status["errors"].append({
@@ -90,13 +162,7 @@ def check_bedrock_health(region_name="us-east-1"):
     except Exception as e:
         error_type = type(e).__name__
         error_message = str(e)
-        stack_trace = traceback.format_exc()
-        logger.error(
-            f"Unexpected exception in check_bedrock_health:\n"
-            f"  Error Type: {error_type}\n"
-            f"  Error Message: {error_message}\n"
-            f"  Stack Trace:\n{stack_trace}"
-        )
+        logger.exception("Unexpected exception in check_bedrock_health")
         health_status["status"] = "unhealthy"
         health_status["errors"].append({
             "type": error_type,
@@ -106,7 +172,7 @@ def check_bedrock_health(region_name="us-east-1"):
     return health_status
 
 
-def validate_model(model_id, region_name="us-east-1"):
+async def validate_model(model_id, region_name="us-east-1"):
     """
     Validate if a specific model ID is accessible.
     
@@ -126,37 +192,21 @@ def validate_model(model_id, region_name="us-east-1"):
     }
     
     try:
-        logger.info(f"Validating model access for model_id: {model_id} in region: {region_name}")
-        
-        bedrock_client = boto3.client(
-            service_name="bedrock",
-            region_name=region_name
-        )
+        # Use the cached model listing if it has the model, otherwise ask Bedrock
+        model_details = foundation_models_service.find_cached_model(model_id, region_name)
+        if model_details is None:
+            async with clients.for_region("bedrock", region_name) as bedrock_client:
+                response = await bedrock_client.get_foundation_model(
+                    modelIdentifier=model_id
+                )
+            model_details = response.get('modelDetails', {})
         
-        # Try to get the foundation model details
-        response = bedrock_client.get_foundation_model(
-            modelIdentifier=model_id
-        )
-        
-        model_details = response.get('modelDetails', {})
         validation_result["accessible"] = True
-        validation_result["model_details"] = {
-            "modelId": model_details.get("modelId"),
-            "modelArn": model_details.get("modelArn"),
-            "modelName": model_details.get("modelName"),
-            "providerName": model_details.get("providerName"),
-            "inputModalities": model_details.get("inputModalities", []),
-            "outputModalities": model_details.get("outputModalities", []),
-            "responseStreamingSupported": model_details.get("responseStreamingSupported"),
-            "customizationsSupported": model_details.get("customizationsSupported", []),
-            "inferenceTypesSupported": model_details.get("inferenceTypesSupported", [])
-        }
+        validation_result["model_details"] = _select_fields(model_details, _MODEL_DETAIL_FIELDS)
         
-        logger.info(f"Model {model_id} is accessible")
-        
-    except NoCredentialsError as e:
+    except NoCredentialsError:
         error_msg = "No AWS credentials found"
-        logger.error(f"NoCredentialsError in validate_model: {error_msg}")
+        logger.error("NoCredentialsError in validate_model: %s", error_msg)
         validation_result["errors"].append({
             "type": "NoCredentialsError",
             "message": error_msg,
@@ -165,7 +215,7 @@ def validate_model(model_id, region_name="us-east-1"):
         
     except PartialCredentialsError as e:
         error_msg = f"Incomplete AWS credentials: {str(e)}"
-        logger.error(f"PartialCredentialsError in validate_model: {error_msg}")
+        logger.error("PartialCredentialsError in validate_model: %s", error_msg)
         validation_result["errors"].append({
             "type": "PartialCredentialsError",
             "message": error_msg,
@@ -176,10 +226,9 @@ def validate_model(model_id, region_name="us-east-1"):
         error_code = e.response["Error"]["Code"]
         error_message = e.response["Error"].get("Message", "Unknown error")
         logger.error(
-            f"ClientError in validate_model:\n"
-            f"  Error Code: {error_code}\n"
-            f"  Error Message: {error_message}\n"
-            f"  Model ID: {model_id}"
+            "ClientError in validate_model: code=%s message=%s model_id=%s",
+            error_code, error_message, model_id,
+            extra={"model_id": model_id, "code": error_code}
         )
         validation_result["errors"].append({
             "type": "ClientError",
@@ -202,13 +251,10 @@ def validate_model(model_id, region_name="us-east-1"):
     except Exception as e:
         error_type = type(e).__name__
         error_message = str(e)
-        stack_trace = traceback.format_exc()
-        logger.error(
-            f"Unexpected exception in validate_model:\n"
-            f"  Error Type: {error_type}\n"
-            f"  Error Message: {error_message}\n"
-            f"  Model ID: {model_id}\n"
-            f"  Stack Trace:\n{stack_trace}"
+        logger.exception(
+            "Unexpected exception in validate_model: model_id=%s",
+            model_id,
+            extra={"model_id": model_id}
         )
         validation_result["errors"].append({
             "type": error_type,
@@ -1,46 +1,83 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Path
+from fastapi.responses import ORJSONResponse, Response
 from botocore.exceptions import ClientError
 from . import models
 from . import services
+import asyncio
+import config
 import logging
-import traceback
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
 @router.post("/foundation-models/model/image/{model_id}/invoke")
-def invoke(body: models.ImageRequest, model_id: str):
+async def invoke(body: models.ImageRequest, model_id: str = Path(pattern=config.MODEL_ID_PATTERN)):
     try:
-        logger.info(f"Image invoke called with model_id: {model_id}")
+        logger.info("Image invoke called with model_id: %s", model_id)
         logger.debug(
-            f"Image invoke request - model_id: {model_id}, "
-            f"prompt: {body.prompt[:100]}..., "
-            f"style_preset: {body.stylePreset}"
+            "Image invoke request - model_id: %s, prompt: %.100s..., style_preset: %s",
+            model_id, body.prompt, body.stylePreset
         )
         
-        response = services.invoke(body.prompt, body.stylePreset, model_id)
+        response = await services.invoke(body.prompt, body.stylePreset, model_id)
         
-        logger.info(f"Image invoke completed successfully for model_id: {model_id}")
-        return {
+        logger.info("Image invoke completed successfully for model_id: %s", model_id)
+        # Returned as a response object so the multi-megabyte base64 string is
+        # serialized by orjson directly instead of going through jsonable_encoder
+        return ORJSONResponse({
             "imageByteArray": response
-        }
+        })
     except ClientError as e:
         error_code = e.response["Error"]["Code"]
         error_message = e.response["Error"].get("Message", "Unknown error")
+        logger.exception(
+            "ClientError in image invoke: code=%s message=%s model_id=%s prompt=%.200s style_preset=%s",
+            error_code, error_message, model_id, body.prompt, body.stylePreset,
+            extra={"model_id": model_id, "code": error_code}
+        )
+        
+        if error_code == "AccessDeniedException":
+            raise HTTPException(status_code=403, detail=error_message)
+        else:
+            raise HTTPException(status_code=500, detail=f"{error_code}: {error_message}")
+    except Exception as e:
         error_type = type(e).__name__
-        stack_trace = traceback.format_exc()
+        error_message = str(e)
+        logger.exception(
+            "Unexpected exception in image invoke: model_id=%s prompt=%.200s style_preset=%s",
+            model_id, body.prompt, body.stylePreset,
+            extra={"model_id": model_id}
+        )
+        
+        raise HTTPException(status_code=500, detail=f"{error_type}: {error_message}")
+
+
+@router.post(
+    "/foundation-models/model/image/{model_id}/invoke/png",
+    response_class=Response,
+    responses={200: {"content": {"image/png": {}}}}
+)
+async def invoke_png(body: models.ImageRequest, model_id: str = Path(pattern=config.MODEL_ID_PATTERN)):
+    """
+    Generate an image and return it as raw `image/png` bytes.
+
+    Avoids the base64 inflation of the JSON `invoke` endpoint, which is kept
+    for existing clients.
+    """
+    try:
+        logger.info("Image invoke_png called with model_id: %s", model_id)
         
-        logger.error(
-            f"ClientError in image invoke:\n"
-            f"  Error Type: {error_type}\n"
-            f"  Error Code: {error_code}\n"
-            f"  Error Message: {error_message}\n"
-            f"  Model ID: {model_id}\n"
-            f"  Prompt: {body.prompt[:200]}...\n"
-            f"  Style Preset: {body.stylePreset}\n"
-            f"  Full Response: {e.response}\n"
-            f"  Stack Trace:\n{stack_trace}"
+        image = await services.invoke_png(body.prompt, body.stylePreset, model_id)
+        
+        return Response(content=image, media_type="image/png")
+    except ClientError as e:
+        error_code = e.response["Error"]["Code"]
+        error_message = e.response["Error"].get("Message", "Unknown error")
+        logger.exception(
+            "ClientError in image invoke_png: code=%s message=%s model_id=%s prompt=%.200s",
+            error_code, error_message, model_id, body.prompt,
+            extra={"model_id": model_id, "code": error_code}
         )
         
         if error_code == "AccessDeniedException":
@@ -50,16 +87,51 @@ def invoke(body: models.ImageRequest, model_id: str):
     except Exception as e:
         error_type = type(e).__name__
         error_message = str(e)
-        stack_trace = traceback.format_exc()
-        
-        logger.error(
-            f"Unexpected exception in image invoke:\n"
-            f"  Error Type: {error_type}\n"
-            f"  Error Message: {error_message}\n"
-            f"  Model ID: {model_id}\n"
-            f"  Prompt: {body.prompt[:200]}...\n"
-            f"  Style Preset: {body.stylePreset}\n"
-            f"  Stack Trace:\n{stack_trace}"
+        logger.exception(
+            "Unexpected exception in image invoke_png: model_id=%s prompt=%.200s",
+            model_id, body.prompt,
+            extra={"model_id": model_id}
         )
         
         raise HTTPException(status_code=500, detail=f"{error_type}: {error_message}")
+
+
+@router.post("/foundation-models/model/image/{model_id}/invoke/batch")
+async def invoke_batch(body: list[models.ImageRequest], model_id: str = Path(pattern=config.MODEL_ID_PATTERN)):
+    """
+    Generate one image per request concurrently.
+
+    Returns a list in request order holding either `imageByteArray` or, for a
+    failed generation, `error` (and `code` for Bedrock client errors), so one
+    failure does not abort the rest of the batch.
+    """
+    if len(body) > config.IMAGE_BATCH_MAX_SIZE:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch size {len(body)} exceeds the maximum of {config.IMAGE_BATCH_MAX_SIZE}"
+        )
+
+    logger.info("Image invoke_batch called with model_id: %s, batch size: %d", model_id, len(body))
+
+    responses = await asyncio.gather(
+        *[services.invoke(request.prompt, request.stylePreset, model_id) for request in body],
+        return_exceptions=True
+    )
+
+    results = []
+    for response in responses:
+        if isinstance(response, ClientError):
+            results.append({
+                "code": response.response["Error"]["Code"],
+                "error": response.response["Error"].get("Message", "Unknown error")
+            })
+        elif isinstance(response, Exception):
+            results.append({
+                "error": f"{type(response).__name__}: {str(response)}"
+            })
+        else:
+            results.append({
+                "imageByteArray": response
+            })
+
+    return ORJSONResponse(results)
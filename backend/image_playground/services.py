@@ -1,17 +1,12 @@
 import base64
-import boto3
-import json
+import clients
 import logging
-import traceback
+import orjson
 
 logger = logging.getLogger(__name__)
 
-bedrock_runtime = boto3.client(
-    service_name="bedrock-runtime",
-    region_name="us-east-1",
-)
-
-STYLES = [
+# Style presets accepted by Stability models; a frozenset for O(1) lookups
+STYLES = frozenset({
     "3d-model",
     "analog-film",
     "anime",
@@ -29,53 +24,66 @@ STYLES = [
     "photographic",
     "pixel-art",
     "tile-texture"
-]
+})
+
+# Generation settings shared by every request; only the prompt and style vary
+_BASE_CONFIG = {
+    "cfg_scale": 20,
+    "steps": 100
+}
+
+
+def _body_prefix(prompt_config):
+    return orjson.dumps(prompt_config)[:-1] + b',"text_prompts":[{"text":'
+
+
+# The request body is serialized once per style preset at import, so each
+# request only has to encode the prompt. Unknown presets get no style_preset.
+_BODY_PREFIXES = {
+    style_preset: _body_prefix(_BASE_CONFIG | {"style_preset": style_preset})
+    for style_preset in STYLES
+}
+_DEFAULT_BODY_PREFIX = _body_prefix(_BASE_CONFIG)
+_BODY_SUFFIX = b"}]}"
+
 
-def invoke(prompt, style_preset, model_id):
+def build_request_body(prompt, style_preset):
+    prefix = _BODY_PREFIXES.get(style_preset, _DEFAULT_BODY_PREFIX)
+    return prefix + orjson.dumps(prompt) + _BODY_SUFFIX
+
+
+async def invoke(prompt, style_preset, model_id):
     try:
-        logger.info(f"Invoking Bedrock for image with model_id: {model_id}")
+        logger.info("Invoking Bedrock for image with model_id: %s", model_id)
         
-        prompt_config = {
-            "text_prompts": [ { "text": prompt } ],
-            "cfg_scale": 20,
-            "steps": 100
-        }
-
-        if style_preset in STYLES:
-            prompt_config["style_preset"] = style_preset
-            logger.debug(f"Using style_preset: {style_preset}")
-        else:
-            logger.debug(f"No style_preset applied (requested: {style_preset})")
-
-        logger.debug(f"Bedrock invoke_model request payload - model_id: {model_id}, config: {json.dumps(prompt_config, indent=2)}")
-
-        response = bedrock_runtime.invoke_model(
-            body=json.dumps(prompt_config),
+        body = build_request_body(prompt, style_preset)
+        logger.debug("Bedrock invoke_model request payload - model_id: %s, body: %s", model_id, body)
+
+        bedrock_runtime = clients.get("bedrock-runtime")
+        response = await bedrock_runtime.invoke_model(
+            body=body,
             modelId=model_id
         )
 
-        logger.debug(f"Bedrock invoke_model raw response metadata: {response.get('ResponseMetadata')}")
+        logger.debug("Bedrock invoke_model raw response metadata: %s", response.get("ResponseMetadata"))
 
-        response_body = json.loads(response["body"].read())
-        logger.debug(f"Bedrock invoke_model response - artifacts count: {len(response_body.get('artifacts', []))}")
+        response_body = orjson.loads(await response["body"].read())
+        logger.debug("Bedrock invoke_model response - artifacts count: %d", len(response_body.get("artifacts", [])))
 
         base64_str = response_body["artifacts"][0]["base64"]
         
-        logger.info(f"Successfully completed Bedrock image invocation for model_id: {model_id}, image size: {len(base64_str)} chars")
+        logger.info("Successfully completed Bedrock image invocation for model_id: %s, image size: %d chars", model_id, len(base64_str))
 
         return base64_str
-    except Exception as e:
-        error_type = type(e).__name__
-        error_message = str(e)
-        stack_trace = traceback.format_exc()
-        
-        logger.error(
-            f"Error in image service invoke:\n"
-            f"  Error Type: {error_type}\n"
-            f"  Error Message: {error_message}\n"
-            f"  Model ID: {model_id}\n"
-            f"  Prompt: {prompt[:200]}...\n"
-            f"  Style Preset: {style_preset}\n"
-            f"  Stack Trace:\n{stack_trace}"
+    except Exception:
+        logger.exception(
+            "Error in image service invoke: model_id=%s prompt=%.200s style_preset=%s",
+            model_id, prompt, style_preset,
+            extra={"model_id": model_id}
         )
-        raise
\ No newline at end of file
+        raise
+
+
+async def invoke_png(prompt, style_preset, model_id):
+    """Generate an image and return the decoded PNG bytes instead of base64."""
+    return base64.b64decode(await invoke(prompt, style_preset, model_id))
@@ -1,16 +1,24 @@
 import uvicorn
+import asyncio
 import logging
 import os
+import sys
 
-from fastapi import FastAPI
+from contextlib import asynccontextmanager, suppress
+from fastapi import FastAPI, Request
+from fastapi.responses import ORJSONResponse, Response
+from fastapi.utils import is_body_allowed_for_status_code
 from fastapi.middleware.cors import CORSMiddleware
+from starlette.exceptions import HTTPException as StarletteHTTPException
 
+import clients
 import config
 from foundation_models.routes import router as foundation_models_router
 from chat_playground.routes import router as chat_playground_router
 from text_playground.routes import router as text_playground_router
 from image_playground.routes import router as image_playground_router
 from health.routes import router as health_router
+from health import service as health_service
 
 # Configure logging with environment variable support
 log_level = os.getenv("LOG_LEVEL", "INFO").upper()
@@ -22,7 +30,35 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 logger.info(f"Starting application with log level: {log_level}")
 
-app = FastAPI()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await clients.start()
+    # Warm up in the background so the server starts accepting connections
+    # (and answering /api/ready with 503) while the first Bedrock call runs
+    warmup = asyncio.create_task(health_service.warm_up())
+    yield
+    warmup.cancel()
+    with suppress(asyncio.CancelledError):
+        await warmup
+    await clients.stop()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=ORJSONResponse)
+
+
+@app.exception_handler(StarletteHTTPException)
+async def http_exception_handler(request: Request, exc: StarletteHTTPException):
+    # Error responses are rendered with orjson too, like every other response
+    headers = getattr(exc, "headers", None)
+    if not is_body_allowed_for_status_code(exc.status_code):
+        return Response(status_code=exc.status_code, headers=headers)
+    return ORJSONResponse(
+        {"detail": exc.detail},
+        status_code=exc.status_code,
+        headers=headers
+    )
+
 
 app.include_router(health_router)
 app.include_router(foundation_models_router)
@@ -38,4 +74,6 @@ app.add_middleware(
 )
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host=config.HOST, port=config.PORT, log_level="info")
\ No newline at end of file
+    # uvloop is not available on Windows, where the default asyncio loop is used
+    loop = "asyncio" if sys.platform == "win32" else "uvloop"
+    uvicorn.run("main:app", host=config.HOST, port=config.PORT, log_level="info", loop=loop, http="httptools")
\ No newline at end of file
@@ -0,0 +1,24 @@
+import asyncio
+import hashlib
+from cachetools import TTLCache
+
+
+class ResponseCache:
+    """TTL cache of model completions, shared by the tasks of one worker."""
+
+    def __init__(self, max_size, ttl_seconds):
+        self._cache = TTLCache(maxsize=max_size, ttl=ttl_seconds)
+        self._lock = asyncio.Lock()
+
+    @staticmethod
+    def make_key(*fields):
+        """Hash the request fields that determine the completion into a cache key."""
+        return hashlib.sha256("\0".join(map(str, fields)).encode()).hexdigest()
+
+    async def get(self, key):
+        async with self._lock:
+            return self._cache.get(key)
+
+    async def put(self, key, completion):
+        async with self._lock:
+            self._cache[key] = completion
@@ -0,0 +1,45 @@
+import logging
+import orjson
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+
+async def claude_text_deltas(event_stream, model_id):
+    """Yield the text deltas of a Claude invoke_model_with_response_stream event stream."""
+    async for event in event_stream:
+        chunk = event.get("chunk")
+        if chunk is None:
+            continue
+
+        payload = orjson.loads(chunk["bytes"])
+        if payload.get("type") == "content_block_delta":
+            yield payload["delta"].get("text", "")
+
+    logger.debug("Bedrock stream completed model_id=%s", model_id)
+
+
+async def sse_events(deltas, model_id):
+    """
+    Encode text deltas as Server-Sent Events, one `data: {"text": ...}` event each.
+
+    The 200 response has already started when a delta fails (e.g. an
+    EventStreamError such as throttlingException), so the error is logged and
+    sent as a final `event: error` with its code and message, letting clients
+    tell a failed reply from a complete one.
+    """
+    try:
+        async for text in deltas:
+            yield b"data: " + orjson.dumps({"text": text}) + b"\n\n"
+    except ClientError as e:
+        error_code = e.response["Error"]["Code"]
+        error_message = e.response["Error"].get("Message", "Unknown error")
+        logger.exception(
+            "ClientError in SSE stream: code=%s message=%s model_id=%s",
+            error_code, error_message, model_id,
+            extra={"model_id": model_id, "code": error_code}
+        )
+        yield b"event: error\ndata: " + orjson.dumps({"code": error_code, "error": error_message}) + b"\n\n"
+    except Exception as e:
+        logger.exception("Unexpected exception in SSE stream: model_id=%s", model_id, extra={"model_id": model_id})
+        yield b"event: error\ndata: " + orjson.dumps({"error": f"{type(e).__name__}: {str(e)}"}) + b"\n\n"
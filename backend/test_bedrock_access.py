@@ -12,10 +12,17 @@ Usage:
     python test_bedrock_access.py
 """
 
+import asyncio
 import boto3
+import contextlib
+import io
 import json
+import orjson
+import os
 import sys
+import time
 import traceback
+from botocore.config import Config
 from datetime import datetime
 from botocore.exceptions import (
     ClientError, 
@@ -24,6 +31,52 @@ from botocore.exceptions import (
     BotoCoreError
 )
 
+# STS caller identities cached between runs, keyed by access key ID. Entries for
+# temporary credentials expire sooner, since those can be as short as 15 minutes.
+IDENTITY_CACHE_FILE = os.path.join(os.path.expanduser("~"), ".cache", "bedrock_tester", "identity.json")
+IDENTITY_CACHE_TTL_SECONDS = 3600
+IDENTITY_CACHE_TTL_TEMPORARY_SECONDS = 900
+
+# One session for the credential check, STS and both Bedrock clients, so the
+# credential provider chain is only resolved once per run
+session = boto3.Session()
+
+
+def load_cached_identity(access_key):
+    """Return the cached STS identity for the access key, or None if missing or expired."""
+    try:
+        with open(IDENTITY_CACHE_FILE) as f:
+            entry = json.load(f).get(access_key)
+    except (OSError, ValueError):
+        return None
+
+    if entry is None or entry["expires_at"] < time.time():
+        return None
+    return entry["identity"]
+
+
+def save_cached_identity(access_key, identity, ttl_seconds):
+    """Store the STS identity for the access key. Failures to write are ignored."""
+    try:
+        with open(IDENTITY_CACHE_FILE) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = {}
+
+    now = time.time()
+    cache = {key: entry for key, entry in cache.items() if entry["expires_at"] >= now}
+    cache[access_key] = {
+        "identity": identity,
+        "expires_at": now + ttl_seconds
+    }
+
+    try:
+        os.makedirs(os.path.dirname(IDENTITY_CACHE_FILE), exist_ok=True)
+        with open(IDENTITY_CACHE_FILE, "w") as f:
+            json.dump(cache, f)
+    except OSError:
+        pass
+
 
 class BedrockAccessTester:
     """Test AWS Bedrock connectivity and model access."""
@@ -37,22 +90,31 @@ class BedrockAccessTester:
         """
         self.region_name = region_name
         self.bedrock_runtime = None
-        self.bedrock_client = None
+        self.started_at = datetime.now()
         self.test_results = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": self.started_at.isoformat(),
             "region": region_name,
             "tests": []
         }
         
-    def print_header(self, title):
+    def print_header(self, title, file=None):
         """Print a formatted section header."""
-        print("\n" + "=" * 80)
-        print(f" {title}")
-        print("=" * 80)
+        print("\n" + "=" * 80, file=file)
+        print(f" {title}", file=file)
+        print("=" * 80, file=file)
         
-    def print_subheader(self, title):
+    def print_subheader(self, title, file=None):
         """Print a formatted subsection header."""
-        print(f"\n--- {title} ---")
+        print(f"\n--- {title} ---", file=file)
+        
+    def run_section(self, section, *args):
+        """Run a test section, writing its buffered output to stdout in one go."""
+        buffer = io.StringIO()
+        try:
+            with contextlib.redirect_stdout(buffer):
+                return section(*args)
+        finally:
+            sys.stdout.write(buffer.getvalue())
         
     def record_test(self, test_name, passed, details):
         """Record test result."""
@@ -68,7 +130,6 @@ class BedrockAccessTester:
         
         try:
             # Try to get credentials from the default credential provider chain
-            session = boto3.Session()
             credentials = session.get_credentials()
             
             if credentials is None:
@@ -90,11 +151,18 @@ class BedrockAccessTester:
             print(f"  Secret Access Key: {'*' * 20} (hidden)")
             print(f"  Session Token: {'Present' if frozen_creds.token else 'Not Present'}")
             
-            # Get identity using STS
+            # Get identity using STS, reusing a cached result from a previous run
             try:
-                sts = boto3.client('sts', region_name=self.region_name)
-                identity = sts.get_caller_identity()
-                print(f"\nAWS Identity:")
+                identity = load_cached_identity(frozen_creds.access_key)
+                if identity is None:
+                    sts = session.client('sts', region_name=self.region_name)
+                    response = sts.get_caller_identity()
+                    identity = {key: response[key] for key in ("Account", "Arn", "UserId")}
+                    ttl_seconds = IDENTITY_CACHE_TTL_TEMPORARY_SECONDS if frozen_creds.token else IDENTITY_CACHE_TTL_SECONDS
+                    save_cached_identity(frozen_creds.access_key, identity, ttl_seconds)
+                    print(f"\nAWS Identity:")
+                else:
+                    print(f"\nAWS Identity (cached):")
                 print(f"  Account: {identity['Account']}")
                 print(f"  User/Role ARN: {identity['Arn']}")
                 print(f"  User ID: {identity['UserId']}")
@@ -129,24 +197,19 @@ class BedrockAccessTester:
             return False
     
     def initialize_bedrock_clients(self):
-        """Initialize Bedrock clients."""
+        """Initialize the Bedrock Runtime client used by the model tests."""
         self.print_header("Initializing AWS Bedrock Clients")
         
         try:
             # Initialize bedrock-runtime client for model invocation
-            self.bedrock_runtime = boto3.client(
+            # Few retries, so an unreachable or cold region fails the run quickly
+            self.bedrock_runtime = session.client(
                 service_name="bedrock-runtime",
-                region_name=self.region_name
+                region_name=self.region_name,
+                config=Config(retries={"max_attempts": 2})
             )
             print(f"✅ Bedrock Runtime client initialized (region: {self.region_name})")
             
-            # Initialize bedrock client for metadata operations
-            self.bedrock_client = boto3.client(
-                service_name="bedrock",
-                region_name=self.region_name
-            )
-            print(f"✅ Bedrock client initialized (region: {self.region_name})")
-            
             return True
         except Exception as e:
             print(f"❌ FAILED to initialize Bedrock clients: {str(e)}")
@@ -154,14 +217,14 @@ class BedrockAccessTester:
             print(traceback.format_exc())
             return False
     
-    def test_claude_model_access(self):
-        """Test access to Claude 3.5 Sonnet model."""
-        self.print_header("TEST 2: Claude 3.5 Sonnet Model Access")
+    def test_claude_model_access(self, out=None):
+        """Test access to Claude 3.5 Sonnet model. Output goes to `out` (default: stdout)."""
+        self.print_header("TEST 2: Claude 3.5 Sonnet Model Access", file=out)
         
         # Use the cross-region inference profile model ID
         model_id = "us.anthropic.claude-3-5-sonnet-20241022-v2:0"
         
-        print(f"Testing model: {model_id}")
+        print(f"Testing model: {model_id}", file=out)
         
         try:
             # Prepare a simple test prompt
@@ -177,9 +240,9 @@ class BedrockAccessTester:
                 ]
             }
             
-            print(f"\nSending test request...")
-            print(f"Request payload:")
-            print(json.dumps(prompt_config, indent=2))
+            print(f"\nSending test request...", file=out)
+            print(f"Request payload:", file=out)
+            print(json.dumps(prompt_config, indent=2), file=out)
             
             # Invoke the model
             response = self.bedrock_runtime.invoke_model(
@@ -188,23 +251,23 @@ class BedrockAccessTester:
             )
             
             # Parse response
-            response_body = json.loads(response.get("body").read())
+            response_body = orjson.loads(response.get("body").read())
             
-            print(f"\n✅ PASSED: Successfully invoked Claude model")
-            print(f"\nResponse metadata:")
-            print(f"  HTTP Status: {response.get('ResponseMetadata', {}).get('HTTPStatusCode')}")
-            print(f"  Request ID: {response.get('ResponseMetadata', {}).get('RequestId')}")
+            print(f"\n✅ PASSED: Successfully invoked Claude model", file=out)
+            print(f"\nResponse metadata:", file=out)
+            print(f"  HTTP Status: {response.get('ResponseMetadata', {}).get('HTTPStatusCode')}", file=out)
+            print(f"  Request ID: {response.get('ResponseMetadata', {}).get('RequestId')}", file=out)
             
-            print(f"\nResponse body structure:")
-            print(f"  Role: {response_body.get('role')}")
-            print(f"  Model: {response_body.get('model')}")
-            print(f"  Stop Reason: {response_body.get('stop_reason')}")
+            print(f"\nResponse body structure:", file=out)
+            print(f"  Role: {response_body.get('role')}", file=out)
+            print(f"  Model: {response_body.get('model')}", file=out)
+            print(f"  Stop Reason: {response_body.get('stop_reason')}", file=out)
             
             # Extract and display the completion
             if 'content' in response_body and len(response_body['content']) > 0:
                 completion = response_body['content'][0]['text']
-                print(f"\nModel response:")
-                print(f"  {completion}")
+                print(f"\nModel response:", file=out)
+                print(f"  {completion}", file=out)
                 
                 self.record_test("Claude Model Access", True, {
                     "model_id": model_id,
@@ -213,7 +276,7 @@ class BedrockAccessTester:
                     "usage": response_body.get('usage', {})
                 })
             else:
-                print(f"\n⚠️  WARNING: Response received but no content found")
+                print(f"\n⚠️  WARNING: Response received but no content found", file=out)
                 self.record_test("Claude Model Access", True, {
                     "model_id": model_id,
                     "warning": "No content in response"
@@ -225,28 +288,28 @@ class BedrockAccessTester:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
             
-            print(f"\n❌ FAILED: AWS ClientError")
-            print(f"\nError Details:")
-            print(f"  Error Code: {error_code}")
-            print(f"  Error Message: {error_message}")
-            print(f"  HTTP Status: {e.response.get('ResponseMetadata', {}).get('HTTPStatusCode')}")
+            print(f"\n❌ FAILED: AWS ClientError", file=out)
+            print(f"\nError Details:", file=out)
+            print(f"  Error Code: {error_code}", file=out)
+            print(f"  Error Message: {error_message}", file=out)
+            print(f"  HTTP Status: {e.response.get('ResponseMetadata', {}).get('HTTPStatusCode')}", file=out)
             
             # Provide specific guidance based on error code
             if error_code == 'AccessDeniedException':
-                print(f"\n🔍 Diagnosis: Insufficient IAM permissions")
-                print(f"  Required permission: bedrock:InvokeModel")
-                print(f"  Resource ARN: arn:aws:bedrock:{self.region_name}::foundation-model/{model_id}")
+                print(f"\n🔍 Diagnosis: Insufficient IAM permissions", file=out)
+                print(f"  Required permission: bedrock:InvokeModel", file=out)
+                print(f"  Resource ARN: arn:aws:bedrock:{self.region_name}::foundation-model/{model_id}", file=out)
             elif error_code == 'ResourceNotFoundException':
-                print(f"\n🔍 Diagnosis: Model not found or not enabled")
-                print(f"  - Verify model ID is correct: {model_id}")
-                print(f"  - Check if model is available in region: {self.region_name}")
-                print(f"  - Ensure model access is enabled in AWS Console > Bedrock > Model access")
+                print(f"\n🔍 Diagnosis: Model not found or not enabled", file=out)
+                print(f"  - Verify model ID is correct: {model_id}", file=out)
+                print(f"  - Check if model is available in region: {self.region_name}", file=out)
+                print(f"  - Ensure model access is enabled in AWS Console > Bedrock > Model access", file=out)
             elif error_code == 'ValidationException':
-                print(f"\n🔍 Diagnosis: Invalid request format")
-                print(f"  - Check API payload format matches model requirements")
+                print(f"\n🔍 Diagnosis: Invalid request format", file=out)
+                print(f"  - Check API payload format matches model requirements", file=out)
             elif error_code == 'ThrottlingException':
-                print(f"\n🔍 Diagnosis: Rate limit exceeded")
-                print(f"  - Too many requests to the model")
+                print(f"\n🔍 Diagnosis: Rate limit exceeded", file=out)
+                print(f"  - Too many requests to the model", file=out)
             
             self.record_test("Claude Model Access", False, {
                 "model_id": model_id,
@@ -256,27 +319,27 @@ class BedrockAccessTester:
             return False
             
         except BotoCoreError as e:
-            print(f"\n❌ FAILED: BotoCoreError - {str(e)}")
-            print(f"\n🔍 Diagnosis: AWS SDK/connectivity issue")
-            print(f"\nStack trace:")
-            print(traceback.format_exc())
+            print(f"\n❌ FAILED: BotoCoreError - {str(e)}", file=out)
+            print(f"\n🔍 Diagnosis: AWS SDK/connectivity issue", file=out)
+            print(f"\nStack trace:", file=out)
+            print(traceback.format_exc(), file=out)
             self.record_test("Claude Model Access", False, f"BotoCoreError: {str(e)}")
             return False
             
         except Exception as e:
-            print(f"\n❌ FAILED: Unexpected error - {str(e)}")
-            print(f"\nStack trace:")
-            print(traceback.format_exc())
+            print(f"\n❌ FAILED: Unexpected error - {str(e)}", file=out)
+            print(f"\nStack trace:", file=out)
+            print(traceback.format_exc(), file=out)
             self.record_test("Claude Model Access", False, f"Exception: {str(e)}")
             return False
     
-    def test_stable_diffusion_model_access(self):
-        """Test access to Stable Diffusion XL model."""
-        self.print_header("TEST 3: Stable Diffusion XL Model Access")
+    def test_stable_diffusion_model_access(self, out=None):
+        """Test access to Stable Diffusion XL model. Output goes to `out` (default: stdout)."""
+        self.print_header("TEST 3: Stable Diffusion XL Model Access", file=out)
         
         model_id = "stability.stable-diffusion-xl-v1"
         
-        print(f"Testing model: {model_id}")
+        print(f"Testing model: {model_id}", file=out)
         
         try:
             # Prepare a simple test prompt for image generation
@@ -291,9 +354,9 @@ class BedrockAccessTester:
                 "seed": 42
             }
             
-            print(f"\nSending test request...")
-            print(f"Request payload:")
-            print(json.dumps(prompt_config, indent=2))
+            print(f"\nSending test request...", file=out)
+            print(f"Request payload:", file=out)
+            print(json.dumps(prompt_config, indent=2), file=out)
             
             # Invoke the model
             response = self.bedrock_runtime.invoke_model(
@@ -302,12 +365,12 @@ class BedrockAccessTester:
             )
             
             # Parse response
-            response_body = json.loads(response["body"].read())
+            response_body = orjson.loads(response["body"].read())
             
-            print(f"\n✅ PASSED: Successfully invoked Stable Diffusion model")
-            print(f"\nResponse metadata:")
-            print(f"  HTTP Status: {response.get('ResponseMetadata', {}).get('HTTPStatusCode')}")
-            print(f"  Request ID: {response.get('ResponseMetadata', {}).get('RequestId')}")
+            print(f"\n✅ PASSED: Successfully invoked Stable Diffusion model", file=out)
+            print(f"\nResponse metadata:", file=out)
+            print(f"  HTTP Status: {response.get('ResponseMetadata', {}).get('HTTPStatusCode')}", file=out)
+            print(f"  Request ID: {response.get('ResponseMetadata', {}).get('RequestId')}", file=out)
             
             # Check artifacts in response
             if 'artifacts' in response_body and len(response_body['artifacts']) > 0:
@@ -315,11 +378,11 @@ class BedrockAccessTester:
                 base64_image = artifact.get('base64', '')
                 finish_reason = artifact.get('finishReason', 'N/A')
                 
-                print(f"\nResponse details:")
-                print(f"  Artifacts count: {len(response_body['artifacts'])}")
-                print(f"  Finish reason: {finish_reason}")
-                print(f"  Image data length: {len(base64_image)} characters")
-                print(f"  Estimated image size: ~{len(base64_image) * 3 // 4 // 1024} KB")
+                print(f"\nResponse details:", file=out)
+                print(f"  Artifacts count: {len(response_body['artifacts'])}", file=out)
+                print(f"  Finish reason: {finish_reason}", file=out)
+                print(f"  Image data length: {len(base64_image)} characters", file=out)
+                print(f"  Estimated image size: ~{len(base64_image) * 3 // 4 // 1024} KB", file=out)
                 
                 self.record_test("Stable Diffusion Model Access", True, {
                     "model_id": model_id,
@@ -328,7 +391,7 @@ class BedrockAccessTester:
                     "image_data_length": len(base64_image)
                 })
             else:
-                print(f"\n⚠️  WARNING: Response received but no artifacts found")
+                print(f"\n⚠️  WARNING: Response received but no artifacts found", file=out)
                 self.record_test("Stable Diffusion Model Access", True, {
                     "model_id": model_id,
                     "warning": "No artifacts in response"
@@ -340,28 +403,28 @@ class BedrockAccessTester:
             error_code = e.response['Error']['Code']
             error_message = e.response['Error']['Message']
             
-            print(f"\n❌ FAILED: AWS ClientError")
-            print(f"\nError Details:")
-            print(f"  Error Code: {error_code}")
-            print(f"  Error Message: {error_message}")
-            print(f"  HTTP Status: {e.response.get('ResponseMetadata', {}).get('HTTPStatusCode')}")
+            print(f"\n❌ FAILED: AWS ClientError", file=out)
+            print(f"\nError Details:", file=out)
+            print(f"  Error Code: {error_code}", file=out)
+            print(f"  Error Message: {error_message}", file=out)
+            print(f"  HTTP Status: {e.response.get('ResponseMetadata', {}).get('HTTPStatusCode')}", file=out)
             
             # Provide specific guidance based on error code
             if error_code == 'AccessDeniedException':
-                print(f"\n🔍 Diagnosis: Insufficient IAM permissions")
-                print(f"  Required permission: bedrock:InvokeModel")
-                print(f"  Resource ARN: arn:aws:bedrock:{self.region_name}::foundation-model/{model_id}")
+                print(f"\n🔍 Diagnosis: Insufficient IAM permissions", file=out)
+                print(f"  Required permission: bedrock:InvokeModel", file=out)
+                print(f"  Resource ARN: arn:aws:bedrock:{self.region_name}::foundation-model/{model_id}", file=out)
             elif error_code == 'ResourceNotFoundException':
-                print(f"\n🔍 Diagnosis: Model not found or not enabled")
-                print(f"  - Verify model ID is correct: {model_id}")
-                print(f"  - Check if model is available in region: {self.region_name}")
-                print(f"  - Ensure model access is enabled in AWS Console > Bedrock > Model access")
+                print(f"\n🔍 Diagnosis: Model not found or not enabled", file=out)
+                print(f"  - Verify model ID is correct: {model_id}", file=out)
+                print(f"  - Check if model is available in region: {self.region_name}", file=out)
+                print(f"  - Ensure model access is enabled in AWS Console > Bedrock > Model access", file=out)
             elif error_code == 'ValidationException':
-                print(f"\n🔍 Diagnosis: Invalid request format")
-                print(f"  - Check API payload format matches model requirements")
+                print(f"\n🔍 Diagnosis: Invalid request format", file=out)
+                print(f"  - Check API payload format matches model requirements", file=out)
             elif error_code == 'ThrottlingException':
-                print(f"\n🔍 Diagnosis: Rate limit exceeded")
-                print(f"  - Too many requests to the model")
+                print(f"\n🔍 Diagnosis: Rate limit exceeded", file=out)
+                print(f"  - Too many requests to the model", file=out)
             
             self.record_test("Stable Diffusion Model Access", False, {
                 "model_id": model_id,
@@ -371,17 +434,17 @@ class BedrockAccessTester:
             return False
             
         except BotoCoreError as e:
-            print(f"\n❌ FAILED: BotoCoreError - {str(e)}")
-            print(f"\n🔍 Diagnosis: AWS SDK/connectivity issue")
-            print(f"\nStack trace:")
-            print(traceback.format_exc())
+            print(f"\n❌ FAILED: BotoCoreError - {str(e)}", file=out)
+            print(f"\n🔍 Diagnosis: AWS SDK/connectivity issue", file=out)
+            print(f"\nStack trace:", file=out)
+            print(traceback.format_exc(), file=out)
             self.record_test("Stable Diffusion Model Access", False, f"BotoCoreError: {str(e)}")
             return False
             
         except Exception as e:
-            print(f"\n❌ FAILED: Unexpected error - {str(e)}")
-            print(f"\nStack trace:")
-            print(traceback.format_exc())
+            print(f"\n❌ FAILED: Unexpected error - {str(e)}", file=out)
+            print(f"\nStack trace:", file=out)
+            print(traceback.format_exc(), file=out)
             self.record_test("Stable Diffusion Model Access", False, f"Exception: {str(e)}")
             return False
     
@@ -409,42 +472,64 @@ class BedrockAccessTester:
         
         # Save results to JSON file
         output_file = "bedrock_test_results.json"
-        with open(output_file, 'w') as f:
-            json.dump(self.test_results, f, indent=2)
+        with open(output_file, 'wb', buffering=1 << 16) as f:
+            f.write(orjson.dumps(self.test_results, option=orjson.OPT_INDENT_2))
         print(f"\nDetailed results saved to: {output_file}")
         
         return passed_tests == total_tests
     
-    def run_all_tests(self):
+    async def run_model_tests(self):
+        """
+        Run the model access tests concurrently.
+        
+        The tests are independent, so the suite takes as long as the slowest
+        one. Each runs in a worker thread (boto3 clients are thread-safe) and
+        writes to its own buffer, printed in order once both have finished.
+        """
+        outputs = [io.StringIO(), io.StringIO()]
+        first_result = len(self.test_results["tests"])
+        
+        await asyncio.gather(
+            asyncio.to_thread(self.test_claude_model_access, outputs[0]),
+            asyncio.to_thread(self.test_stable_diffusion_model_access, outputs[1])
+        )
+        
+        for output in outputs:
+            sys.stdout.write(output.getvalue())
+        
+        # Keep results in a stable order regardless of which test finished first
+        self.test_results["tests"][first_result:] = sorted(
+            self.test_results["tests"][first_result:],
+            key=lambda test: test["name"]
+        )
+    
+    async def run_all_tests(self):
         """Run all tests and return overall success status."""
         print("\n" + "=" * 80)
         print(" AWS BEDROCK ACCESS TEST SUITE")
         print("=" * 80)
-        print(f"\nTimestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        print(f"\nTimestamp: {self.started_at.strftime('%Y-%m-%d %H:%M:%S')}")
         print(f"Region: {self.region_name}")
         
         # Test 1: AWS Credentials
-        creds_ok = self.test_aws_credentials()
+        creds_ok = self.run_section(self.test_aws_credentials)
         
         if not creds_ok:
             print("\n⚠️  Skipping remaining tests due to credential failure")
-            self.print_summary()
+            self.run_section(self.print_summary)
             return False
         
         # Initialize clients
-        if not self.initialize_bedrock_clients():
+        if not self.run_section(self.initialize_bedrock_clients):
             print("\n⚠️  Skipping remaining tests due to client initialization failure")
-            self.print_summary()
+            self.run_section(self.print_summary)
             return False
         
-        # Test 2: Claude Model
-        self.test_claude_model_access()
-        
-        # Test 3: Stable Diffusion Model
-        self.test_stable_diffusion_model_access()
+        # Test 2 and 3: Claude and Stable Diffusion models
+        await self.run_model_tests()
         
         # Print summary
-        all_passed = self.print_summary()
+        all_passed = self.run_section(self.print_summary)
         
         return all_passed
 
@@ -460,7 +545,7 @@ def main():
     tester = BedrockAccessTester(region_name=region)
     
     try:
-        all_passed = tester.run_all_tests()
+        all_passed = asyncio.run(tester.run_all_tests())
         sys.exit(0 if all_passed else 1)
     except KeyboardInterrupt:
         print("\n\n⚠️  Test interrupted by user")
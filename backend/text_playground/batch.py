@@ -0,0 +1,107 @@
+import clients
+import config
+import logging
+import orjson
+import time
+import uuid
+from . import claude
+
+logger = logging.getLogger(__name__)
+
+# Model ID -> function building the model's request body, used as modelInput.
+# Bedrock batch inference does not support Jurassic-2
+BODY_BUILDERS = {
+    claude.MODEL_ID: claude.build_request_body
+}
+
+# Job states in which Bedrock has written the output file
+RESULT_STATUSES = {"Completed", "PartiallyCompleted"}
+
+
+def is_configured():
+    return bool(config.BATCH_INFERENCE_S3_BUCKET and config.BATCH_INFERENCE_ROLE_ARN)
+
+
+def _split_s3_uri(uri):
+    bucket, _, key = uri[len("s3://"):].partition("/")
+    return bucket, key
+
+
+def build_input(model_id, records, temperature, max_tokens):
+    """Return the JSONL job input with one {"recordId", "modelInput"} line per record."""
+    build_request_body = BODY_BUILDERS[model_id]
+    return b"".join(
+        b'{"recordId":' + orjson.dumps(record.recordId) +
+        b',"modelInput":' + build_request_body(record.prompt, temperature, max_tokens) +
+        b"}\n"
+        for record in records
+    )
+
+
+async def create_job(model_id, records, temperature, max_tokens):
+    """
+    Upload the records to S3 and start a Bedrock batch inference job for them.
+
+    Returns:
+        dict: jobArn and jobId of the created job
+    """
+    job_name = f"fm-playground-{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    bucket = config.BATCH_INFERENCE_S3_BUCKET
+    input_key = f"{config.BATCH_INFERENCE_S3_PREFIX}/input/{job_name}.jsonl"
+    output_uri = f"s3://{bucket}/{config.BATCH_INFERENCE_S3_PREFIX}/output/"
+
+    logger.info("Creating batch inference job %s for model_id: %s with %d records", job_name, model_id, len(records))
+
+    await clients.get("s3").put_object(
+        Bucket=bucket,
+        Key=input_key,
+        Body=build_input(model_id, records, temperature, max_tokens)
+    )
+
+    response = await clients.get("bedrock").create_model_invocation_job(
+        jobName=job_name,
+        roleArn=config.BATCH_INFERENCE_ROLE_ARN,
+        modelId=model_id,
+        inputDataConfig={
+            "s3InputDataConfig": {
+                "s3Uri": f"s3://{bucket}/{input_key}",
+                "s3InputFormat": "JSONL"
+            }
+        },
+        outputDataConfig={
+            "s3OutputDataConfig": {
+                "s3Uri": output_uri
+            }
+        }
+    )
+
+    job_arn = response["jobArn"]
+    return {
+        "jobArn": job_arn,
+        "jobId": job_arn.rsplit("/", 1)[-1]
+    }
+
+
+async def get_job(job_id):
+    """Return the Bedrock description of the batch inference job."""
+    return await clients.get("bedrock").get_model_invocation_job(jobIdentifier=job_id)
+
+
+async def open_results(job):
+    """
+    Open the JSONL output of a finished job in S3.
+
+    Each line holds the recordId, the modelInput and either the modelOutput or
+    an error for that record.
+
+    Returns:
+        The S3 get_object response; its Body can be streamed with iter_chunks()
+    """
+    _, input_key = _split_s3_uri(job["inputDataConfig"]["s3InputDataConfig"]["s3Uri"])
+    output_bucket, output_prefix = _split_s3_uri(job["outputDataConfig"]["s3OutputDataConfig"]["s3Uri"])
+
+    # Bedrock writes <output prefix>/<job ID>/<input file name>.out
+    job_id = job["jobArn"].rsplit("/", 1)[-1]
+    output_key = f"{output_prefix.rstrip('/')}/{job_id}/{input_key.rsplit('/', 1)[-1]}.out"
+
+    return await clients.get("s3").get_object(Bucket=output_bucket, Key=output_key)
@@ -0,0 +1,15 @@
+import config
+from response_cache import ResponseCache
+
+_cache = ResponseCache(config.TEXT_CACHE_MAX_SIZE, config.TEXT_CACHE_TTL_SECONDS)
+
+get = _cache.get
+put = _cache.put
+
+
+def make_key(model_id, prompt, temperature, max_tokens):
+    return ResponseCache.make_key(model_id, prompt, round(temperature, 3), max_tokens)
+
+
+def is_cacheable(temperature):
+    return temperature <= config.TEXT_CACHE_MAX_TEMPERATURE
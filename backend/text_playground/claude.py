@@ -1,63 +1,75 @@
-import boto3
-import json
+import clients
 import logging
-import traceback
+import orjson
+import streaming
+from . import regions
 
 logger = logging.getLogger(__name__)
 
-bedrock_runtime = boto3.client(
-    service_name="bedrock-runtime",
-    region_name="us-east-1",
+MODEL_ID = "us.anthropic.claude-3-5-sonnet-20241022-v2:0"
+
+
+# Request body with the per-call fields left as placeholders. Values are
+# JSON-encoded with orjson before being substituted, so the prompt is escaped
+_BODY_TEMPLATE = (
+    b'{"anthropic_version":"bedrock-2023-05-31",'
+    b'"max_tokens":%d,"temperature":%b,'
+    b'"messages":[{"role":"user","content":%b}]}'
 )
 
-def invoke(prompt, temperature, max_tokens):
+
+def build_request_body(prompt, temperature, max_tokens):
+    return _BODY_TEMPLATE % (max_tokens, orjson.dumps(temperature), orjson.dumps(prompt))
+
+
+async def invoke(prompt, temperature, max_tokens):
     try:
-        model_id = "us.anthropic.claude-3-5-sonnet-20241022-v2:0"
-        logger.info(f"Invoking Claude model: {model_id}")
+        model_id = MODEL_ID
+        logger.info("Invoking Claude model: %s", model_id)
         
-        prompt_config = {
-            "anthropic_version": "bedrock-2023-05-31",
-            "max_tokens": max_tokens,
-            "temperature": temperature,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt
-                }
-            ]
-        }
-
-        logger.debug(
-            f"Bedrock invoke_model request payload - model_id: {model_id}, "
-            f"config: {json.dumps(prompt_config, indent=2)}"
-        )
+        body = build_request_body(prompt, temperature, max_tokens)
 
-        response = bedrock_runtime.invoke_model(
-            body=json.dumps(prompt_config),
-            modelId=model_id
-        )
+        logger.debug("Bedrock invoke_model request payload - model_id: %s, body: %s", model_id, body)
 
-        logger.debug(f"Bedrock invoke_model raw response metadata: {response.get('ResponseMetadata')}")
+        async def invoke_model(bedrock_runtime):
+            response = await bedrock_runtime.invoke_model(
+                body=body,
+                modelId=model_id
+            )
+            logger.debug("Bedrock invoke_model raw response metadata: %s", response.get("ResponseMetadata"))
+            return orjson.loads(await response["body"].read())
 
-        response_body = json.loads(response.get("body").read())
-        logger.debug(f"Bedrock invoke_model response body: {json.dumps(response_body, indent=2)}")
+        response_body = await regions.call(invoke_model)
+        logger.debug("Bedrock invoke_model response body: %s", response_body)
 
         completion = response_body['content'][0]['text']
-        logger.info(f"Successfully completed Claude invocation, response length: {len(completion)} chars")
+        logger.info("Successfully completed Claude invocation, response length: %d chars", len(completion))
         
         return completion
-    except Exception as e:
-        error_type = type(e).__name__
-        error_message = str(e)
-        stack_trace = traceback.format_exc()
-        
-        logger.error(
-            f"Error in Claude invoke:\n"
-            f"  Error Type: {error_type}\n"
-            f"  Error Message: {error_message}\n"
-            f"  Prompt: {prompt[:200]}...\n"
-            f"  Temperature: {temperature}\n"
-            f"  Max Tokens: {max_tokens}\n"
-            f"  Stack Trace:\n{stack_trace}"
+    except Exception:
+        logger.exception(
+            "Error in Claude invoke: prompt=%.200s temperature=%s max_tokens=%s",
+            prompt, temperature, max_tokens
         )
         raise
+
+
+async def invoke_stream(prompt, temperature, max_tokens):
+    """Start a streaming Claude invocation and return an async generator of text deltas."""
+    try:
+        logger.info("Invoking Claude model with response stream: %s", MODEL_ID)
+
+        response = await clients.get("bedrock-runtime").invoke_model_with_response_stream(
+            body=build_request_body(prompt, temperature, max_tokens),
+            modelId=MODEL_ID
+        )
+
+        logger.debug("Bedrock invoke_model_with_response_stream raw response metadata: %s", response.get("ResponseMetadata"))
+    except Exception:
+        logger.exception(
+            "Error in Claude invoke_stream: prompt=%.200s temperature=%s max_tokens=%s",
+            prompt, temperature, max_tokens
+        )
+        raise
+
+    return streaming.claude_text_deltas(response["body"], MODEL_ID)
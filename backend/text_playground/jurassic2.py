@@ -1,61 +1,66 @@
-import boto3
-import json
+import clients
 import logging
-import traceback
+import orjson
 
 logger = logging.getLogger(__name__)
 
-bedrock_runtime = boto3.client(
-    service_name="bedrock-runtime",
-    region_name="us-east-1",
-)
+MODEL_ID = "ai21.j2-mid-v1"
 
-def invoke(prompt, temperature, max_tokens):
+
+def build_request_body(prompt, temperature, max_tokens):
+    return orjson.dumps({
+        "prompt": prompt,
+        "maxTokens": max_tokens,
+        "temperature": temperature
+    })
+
+
+async def invoke(prompt, temperature, max_tokens):
     try:
-        model_id = "ai21.j2-mid-v1"
-        logger.info(f"Invoking Jurassic-2 model: {model_id}")
+        model_id = MODEL_ID
+        logger.info("Invoking Jurassic-2 model: %s", model_id)
         
-        prompt_config = {
-            "prompt": prompt,
-            "maxTokens": max_tokens,
-            "temperature": temperature
-        }
-
-        logger.debug(
-            f"Bedrock invoke_model request payload - model_id: {model_id}, "
-            f"config: {json.dumps(prompt_config, indent=2)}"
-        )
+        body = build_request_body(prompt, temperature, max_tokens)
+
+        logger.debug("Bedrock invoke_model request payload - model_id: %s, body: %s", model_id, body)
 
-        response = bedrock_runtime.invoke_model(
-            body=json.dumps(prompt_config),
+        bedrock_runtime = clients.get("bedrock-runtime")
+        response = await bedrock_runtime.invoke_model(
+            body=body,
             modelId=model_id
         )
 
-        logger.debug(f"Bedrock invoke_model raw response metadata: {response.get('ResponseMetadata')}")
+        logger.debug("Bedrock invoke_model raw response metadata: %s", response.get("ResponseMetadata"))
 
-        response_body = json.loads(response.get("body").read())
-        logger.debug(f"Bedrock invoke_model response body: {json.dumps(response_body, indent=2)}")
+        response_body = orjson.loads(await response["body"].read())
+        logger.debug("Bedrock invoke_model response body: %s", response_body)
 
         completion = response_body["completions"][0]["data"]["text"]
         if completion.startswith("\n"):
             completion = completion[1:]
             logger.debug("Stripped leading newline from completion")
 
-        logger.info(f"Successfully completed Jurassic-2 invocation, response length: {len(completion)} chars")
+        logger.info("Successfully completed Jurassic-2 invocation, response length: %d chars", len(completion))
         
         return completion
-    except Exception as e:
-        error_type = type(e).__name__
-        error_message = str(e)
-        stack_trace = traceback.format_exc()
-        
-        logger.error(
-            f"Error in Jurassic-2 invoke:\n"
-            f"  Error Type: {error_type}\n"
-            f"  Error Message: {error_message}\n"
-            f"  Prompt: {prompt[:200]}...\n"
-            f"  Temperature: {temperature}\n"
-            f"  Max Tokens: {max_tokens}\n"
-            f"  Stack Trace:\n{stack_trace}"
+    except Exception:
+        logger.exception(
+            "Error in Jurassic-2 invoke: prompt=%.200s temperature=%s max_tokens=%s",
+            prompt, temperature, max_tokens
         )
         raise
+
+
+async def invoke_stream(prompt, temperature, max_tokens):
+    """
+    Return the completion as an async generator with a single text delta.
+
+    Jurassic-2 has no streaming API on Bedrock, so this waits for the full
+    completion and exists to give both providers the same interface.
+    """
+    completion = await invoke(prompt, temperature, max_tokens)
+
+    async def deltas():
+        yield completion
+
+    return deltas()
@@ -0,0 +1,46 @@
+import asyncio
+import config
+from contextlib import asynccontextmanager
+
+# Model ID -> semaphore bounding the invocations in flight for that model
+_semaphores = {}
+
+
+def _semaphore(model_id):
+    semaphore = _semaphores.get(model_id)
+    if semaphore is None:
+        semaphore = _semaphores[model_id] = asyncio.Semaphore(config.TEXT_MAX_CONCURRENT_INVOCATIONS)
+    return semaphore
+
+
+@asynccontextmanager
+async def slot(model_id):
+    """
+    Wait for one of the model's concurrency slots and hold it for the block.
+
+    Requests over the limit queue here instead of being sent to Bedrock, where
+    they would count against the account's quota and come back throttled.
+    """
+    async with _semaphore(model_id):
+        yield
+
+
+async def acquire(model_id):
+    """
+    Wait for one of the model's concurrency slots and return a function that
+    frees it, for slots that outlive a block (e.g. a streamed response).
+
+    The function can safely be called more than once; only the first call
+    releases the slot.
+    """
+    semaphore = _semaphore(model_id)
+    await semaphore.acquire()
+    released = False
+
+    def release():
+        nonlocal released
+        if not released:
+            released = True
+            semaphore.release()
+
+    return release
@@ -1,4 +1,5 @@
-from pydantic import BaseModel
+import config
+from pydantic import BaseModel, Field
 
 class TextRequest(BaseModel):
     prompt: str
@@ -24,4 +25,14 @@ class Jurassic2Request(TextRequest):
     maxTokens: int = 200
 
 class TextResponse(BaseModel):
-    completion: str
\ No newline at end of file
+    completion: str
+
+class BatchRecord(BaseModel):
+    # Returned with the record's output to match results to prompts
+    recordId: str = Field(pattern=config.BATCH_RECORD_ID_PATTERN)
+    prompt: str
+
+class BatchRequest(BaseModel):
+    records: list[BatchRecord]
+    temperature: float = 0.5
+    maxTokens: int = 200
@@ -0,0 +1,50 @@
+import clients
+import config
+import itertools
+import logging
+from botocore.exceptions import ClientError, HTTPClientError
+from botocore.exceptions import ConnectionError as BotoConnectionError
+
+logger = logging.getLogger(__name__)
+
+# Transient errors the default client's retries are meant to absorb
+_RETRYABLE_ERROR_CODES = {
+    "ServiceUnavailableException",
+    "ModelNotReadyException",
+    "InternalServerException"
+}
+
+_rotation = itertools.count()
+
+
+async def call(operation):
+    """
+    Run operation(bedrock_runtime) against the next region in the rotation.
+
+    Regions from config.CLAUDE_REGIONS are used round-robin, on clients that do
+    not retry in-region, so a throttled call moves on to the next region
+    straight away. Once every region has throttled, or on another transient
+    error, the call is made once more on the shared client in the default
+    region, whose retries back off before giving up.
+    """
+    regions = config.CLAUDE_REGIONS
+    start = next(_rotation)
+
+    for attempt in range(len(regions)):
+        region = regions[(start + attempt) % len(regions)]
+        try:
+            return await operation(clients.get_failover(region))
+        except ClientError as e:
+            error_code = e.response["Error"]["Code"]
+            if error_code == "ThrottlingException":
+                logger.warning("Throttled in region %s, failing over", region)
+                continue
+            if error_code not in _RETRYABLE_ERROR_CODES:
+                raise
+            logger.warning("%s in region %s, retrying on the default client", error_code, region)
+            break
+        except (BotoConnectionError, HTTPClientError) as e:
+            logger.warning("%s in region %s, retrying on the default client", type(e).__name__, region)
+            break
+
+    return await operation(clients.get("bedrock-runtime"))
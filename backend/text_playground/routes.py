@@ -1,55 +1,126 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Header, HTTPException, Path
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
 from botocore.exceptions import ClientError
 from . import models
+from . import batch
+from . import cache
 from . import claude
 from . import jurassic2
+from . import limiter
+import config
 import logging
-import traceback
+import streaming
 
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# Model ID -> provider coroutine, for the plain and the streaming endpoints
+INVOKERS = {
+    claude.MODEL_ID: claude.invoke,
+    jurassic2.MODEL_ID: jurassic2.invoke
+}
+
+STREAM_INVOKERS = {
+    claude.MODEL_ID: claude.invoke_stream,
+    jurassic2.MODEL_ID: jurassic2.invoke_stream
+}
+
 @router.post("/foundation-models/model/text/{modelId}/invoke")
-def invoke(body: models.TextRequest, modelId: str):
+async def invoke(body: models.TextRequest, modelId: str, x_no_cache: bool = Header(False)):
     try:
-        logger.info(f"Text invoke called with model_id: {modelId}")
+        logger.info("Text invoke called with model_id: %s", modelId)
         logger.debug(
-            f"Text invoke request - model_id: {modelId}, "
-            f"prompt: {body.prompt[:100]}..., "
-            f"temperature: {body.temperature}, "
-            f"max_tokens: {body.maxTokens}"
+            "Text invoke request - model_id: %s, prompt: %.100s..., temperature: %s, max_tokens: %s",
+            modelId, body.prompt, body.temperature, body.maxTokens
         )
         
-        if modelId == "us.anthropic.claude-3-5-sonnet-20241022-v2:0":
-            completion = claude.invoke(body.prompt, body.temperature, body.maxTokens)
-        elif modelId == "ai21.j2-mid-v1":
-            completion = jurassic2.invoke(body.prompt, body.temperature, body.maxTokens)
-        else:
-            logger.warning(f"Unsupported model requested: {modelId}")
+        invoker = INVOKERS.get(modelId)
+        if invoker is None:
+            logger.warning("Unsupported model requested: %s", modelId)
             raise HTTPException(status_code=400, detail=f"Unsupported model: {modelId}")
 
-        logger.info(f"Text invoke completed successfully for model_id: {modelId}")
+        # x-no-cache skips the lookup but still stores the fresh completion,
+        # so it refreshes the cached entry
+        cacheable = cache.is_cacheable(body.temperature)
+        if cacheable:
+            cache_key = cache.make_key(modelId, body.prompt, body.temperature, body.maxTokens)
+            completion = None if x_no_cache else await cache.get(cache_key)
+            if completion is not None:
+                logger.info("Text cache hit model_id=%s", modelId)
+                return models.TextResponse(
+                    completion=completion
+                )
+
+        async with limiter.slot(modelId):
+            completion = await invoker(body.prompt, body.temperature, body.maxTokens)
+
+        if cacheable:
+            await cache.put(cache_key, completion)
+
+        logger.info("Text invoke completed successfully for model_id: %s", modelId)
         return models.TextResponse(
             completion=completion
         )
     except ClientError as e:
         error_code = e.response["Error"]["Code"]
         error_message = e.response["Error"].get("Message", "Unknown error")
+        logger.exception(
+            "ClientError in text invoke: code=%s message=%s model_id=%s prompt=%.200s temperature=%s max_tokens=%s",
+            error_code, error_message, modelId, body.prompt, body.temperature, body.maxTokens,
+            extra={"model_id": modelId, "code": error_code}
+        )
+        
+        if error_code == "AccessDeniedException":
+            raise HTTPException(status_code=403, detail=error_message)
+        else:
+            raise HTTPException(status_code=500, detail=f"{error_code}: {error_message}")
+    except HTTPException:
+        # Re-raise HTTPExceptions without modification
+        raise
+    except Exception as e:
         error_type = type(e).__name__
-        stack_trace = traceback.format_exc()
+        error_message = str(e)
+        logger.exception(
+            "Unexpected exception in text invoke: model_id=%s prompt=%.200s temperature=%s max_tokens=%s",
+            modelId, body.prompt, body.temperature, body.maxTokens,
+            extra={"model_id": modelId}
+        )
+        
+        raise HTTPException(status_code=500, detail=f"{error_type}: {error_message}")
+
+
+@router.post("/foundation-models/model/text/{modelId}/invoke/stream")
+async def invoke_stream(body: models.TextRequest, modelId: str):
+    """
+    Stream the completion as Server-Sent Events, one `data: {"text": ...}` event per token delta.
+    An error after the stream has started is sent as a final `event: error` event.
+
+    Jurassic-2 has no streaming API on Bedrock, so its completion is sent as a single event.
+    The model's concurrency slot is held until the stream ends.
+    """
+    try:
+        logger.info("Text invoke_stream called with model_id: %s", modelId)
         
-        logger.error(
-            f"ClientError in text invoke:\n"
-            f"  Error Type: {error_type}\n"
-            f"  Error Code: {error_code}\n"
-            f"  Error Message: {error_message}\n"
-            f"  Model ID: {modelId}\n"
-            f"  Prompt: {body.prompt[:200]}...\n"
-            f"  Temperature: {body.temperature}\n"
-            f"  Max Tokens: {body.maxTokens}\n"
-            f"  Full Response: {e.response}\n"
-            f"  Stack Trace:\n{stack_trace}"
+        invoker = STREAM_INVOKERS.get(modelId)
+        if invoker is None:
+            logger.warning("Unsupported model requested: %s", modelId)
+            raise HTTPException(status_code=400, detail=f"Unsupported model: {modelId}")
+
+        release_slot = await limiter.acquire(modelId)
+        try:
+            deltas = await invoker(body.prompt, body.temperature, body.maxTokens)
+        except BaseException:
+            release_slot()
+            raise
+    except ClientError as e:
+        error_code = e.response["Error"]["Code"]
+        error_message = e.response["Error"].get("Message", "Unknown error")
+        logger.exception(
+            "ClientError in text invoke_stream: code=%s message=%s model_id=%s",
+            error_code, error_message, modelId,
+            extra={"model_id": modelId, "code": error_code}
         )
         
         if error_code == "AccessDeniedException":
@@ -57,22 +128,154 @@ def invoke(body: models.TextRequest, modelId: str):
         else:
             raise HTTPException(status_code=500, detail=f"{error_code}: {error_message}")
     except HTTPException:
-        # Re-raise HTTPExceptions without modification
         raise
     except Exception as e:
         error_type = type(e).__name__
         error_message = str(e)
-        stack_trace = traceback.format_exc()
+        logger.exception(
+            "Unexpected exception in text invoke_stream: model_id=%s",
+            modelId,
+            extra={"model_id": modelId}
+        )
         
-        logger.error(
-            f"Unexpected exception in text invoke:\n"
-            f"  Error Type: {error_type}\n"
-            f"  Error Message: {error_message}\n"
-            f"  Model ID: {modelId}\n"
-            f"  Prompt: {body.prompt[:200]}...\n"
-            f"  Temperature: {body.temperature}\n"
-            f"  Max Tokens: {body.maxTokens}\n"
-            f"  Stack Trace:\n{stack_trace}"
+        raise HTTPException(status_code=500, detail=f"{error_type}: {error_message}")
+
+    async def events():
+        try:
+            async for event in streaming.sse_events(deltas, modelId):
+                yield event
+        finally:
+            release_slot()
+
+    # The background task also frees the slot when the client disconnects
+    # before the stream has started
+    return StreamingResponse(events(), media_type="text/event-stream", background=BackgroundTask(release_slot))
+
+
+@router.post("/foundation-models/model/text/{modelId}/batch")
+async def create_batch(body: models.BatchRequest, modelId: str):
+    """
+    Start a Bedrock batch inference job for the records.
+
+    Batch jobs run asynchronously at a lower price than on-demand invocations
+    and do not count against the on-demand quotas. Poll the returned jobId with
+    GET /foundation-models/model/text/batch/{jobId}.
+    """
+    if not batch.is_configured():
+        raise HTTPException(
+            status_code=503,
+            detail="Batch inference is not configured. Set BATCH_INFERENCE_S3_BUCKET and BATCH_INFERENCE_ROLE_ARN."
+        )
+    if modelId not in batch.BODY_BUILDERS:
+        logger.warning("Unsupported model requested for batch: %s", modelId)
+        raise HTTPException(status_code=400, detail=f"Unsupported model: {modelId}")
+    if not config.BATCH_INFERENCE_MIN_RECORDS <= len(body.records) <= config.BATCH_INFERENCE_MAX_RECORDS:
+        raise HTTPException(
+            status_code=422,
+            detail=f"Batch jobs need between {config.BATCH_INFERENCE_MIN_RECORDS} and {config.BATCH_INFERENCE_MAX_RECORDS} records, got {len(body.records)}"
+        )
+    if len({record.recordId for record in body.records}) != len(body.records):
+        raise HTTPException(status_code=422, detail="Record IDs must be unique within a batch")
+
+    try:
+        return await batch.create_job(modelId, body.records, body.temperature, body.maxTokens)
+    except ClientError as e:
+        error_code = e.response["Error"]["Code"]
+        error_message = e.response["Error"].get("Message", "Unknown error")
+        logger.exception(
+            "ClientError in text create_batch: code=%s message=%s model_id=%s",
+            error_code, error_message, modelId,
+            extra={"model_id": modelId, "code": error_code}
         )
         
-        raise HTTPException(status_code=500, detail=f"{error_type}: {error_message}")
\ No newline at end of file
+        if error_code == "AccessDeniedException":
+            raise HTTPException(status_code=403, detail=error_message)
+        else:
+            raise HTTPException(status_code=500, detail=f"{error_code}: {error_message}")
+    except Exception as e:
+        error_type = type(e).__name__
+        error_message = str(e)
+        logger.exception(
+            "Unexpected exception in text create_batch: model_id=%s",
+            modelId,
+            extra={"model_id": modelId}
+        )
+        
+        raise HTTPException(status_code=500, detail=f"{error_type}: {error_message}")
+
+
+@router.get("/foundation-models/model/text/batch/{jobId}")
+async def get_batch(jobId: str = Path(pattern=r"^[a-z0-9]{12}$")):
+    """Return the status of a batch inference job."""
+    try:
+        job = await batch.get_job(jobId)
+    except ClientError as e:
+        error_code = e.response["Error"]["Code"]
+        error_message = e.response["Error"].get("Message", "Unknown error")
+        logger.exception(
+            "ClientError in text get_batch: code=%s message=%s job_id=%s",
+            error_code, error_message, jobId,
+            extra={"code": error_code}
+        )
+        
+        if error_code == "ResourceNotFoundException":
+            raise HTTPException(status_code=404, detail=error_message)
+        elif error_code == "AccessDeniedException":
+            raise HTTPException(status_code=403, detail=error_message)
+        else:
+            raise HTTPException(status_code=500, detail=f"{error_code}: {error_message}")
+    except Exception as e:
+        error_type = type(e).__name__
+        error_message = str(e)
+        logger.exception("Unexpected exception in text get_batch: job_id=%s", jobId)
+        
+        raise HTTPException(status_code=500, detail=f"{error_type}: {error_message}")
+
+    return {
+        "jobId": jobId,
+        "jobArn": job["jobArn"],
+        "modelId": job["modelId"],
+        "status": job["status"],
+        "message": job.get("message")
+    }
+
+
+@router.get("/foundation-models/model/text/batch/{jobId}/results")
+async def get_batch_results(jobId: str = Path(pattern=r"^[a-z0-9]{12}$")):
+    """
+    Stream the JSONL output of a finished batch inference job from S3.
+
+    Returns 409 while the job has not produced output yet. The output object is
+    opened before the response starts, so S3 errors get a proper status code.
+    """
+    try:
+        job = await batch.get_job(jobId)
+        if job["status"] not in batch.RESULT_STATUSES:
+            raise HTTPException(status_code=409, detail=f"Batch job {jobId} has no results yet (status: {job['status']})")
+
+        results = await batch.open_results(job)
+    except HTTPException:
+        raise
+    except ClientError as e:
+        error_code = e.response["Error"]["Code"]
+        error_message = e.response["Error"].get("Message", "Unknown error")
+        logger.exception(
+            "ClientError in text get_batch_results: code=%s message=%s job_id=%s",
+            error_code, error_message, jobId,
+            extra={"code": error_code}
+        )
+        
+        if error_code in ("ResourceNotFoundException", "NoSuchKey"):
+            raise HTTPException(status_code=404, detail=error_message)
+        elif error_code in ("AccessDeniedException", "AccessDenied"):
+            raise HTTPException(status_code=403, detail=error_message)
+        else:
+            raise HTTPException(status_code=500, detail=f"{error_code}: {error_message}")
+    except Exception as e:
+        error_type = type(e).__name__
+        error_message = str(e)
+        logger.exception("Unexpected exception in text get_batch_results: job_id=%s", jobId)
+        
+        raise HTTPException(status_code=500, detail=f"{error_type}: {error_message}")
+
+    return StreamingResponse(results["Body"].iter_chunks(), media_type="application/x-ndjson")